@@ -25,6 +25,11 @@ engine = create_engine(sqlite_url, echo=True, connect_args=connect_args)
 def create_db_and_tables():
     """Create all tables based on SQLModel metadata."""
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist, so add indexes introduced
+    # after a database was first created
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 def get_session():
     """Database session dependency."""
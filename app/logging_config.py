@@ -0,0 +1,30 @@
+"""Logging setup shared by the API and the OCR inference service."""
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def start_queue_logging() -> QueueListener:
+    """
+    Route the application's loggers (``app.*``) through a queue.
+
+    Request and OCR threads only enqueue records; a background listener
+    thread does the formatting and stream I/O. Level comes from LOG_LEVEL
+    (default INFO). Call ``stop()`` on the returned listener at shutdown to
+    flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    app_logger = logging.getLogger("app")
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    app_logger.propagate = False
+
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
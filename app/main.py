@@ -23,7 +23,7 @@ from .models import (
     InstallationSession,
     ValidationCheck
 )
-from .services.ocr import SmartMeterReader, save_upload_file
+from .services.ocr import get_meter_reader, save_upload_file
 from .auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES, 
     create_access_token, 
@@ -31,7 +31,9 @@ from .auth import (
     verify_password,
     get_password_hash
 )
-from .routers import organizations, installation, logs
+from .routers import organizations, installation, logs, fixtures
+from .logging_config import start_queue_logging
+from .middleware import get_rbac_cache
 import os
 import uuid
 from dotenv import load_dotenv
@@ -55,6 +57,9 @@ app.add_middleware(
 app.include_router(organizations.router)
 app.include_router(installation.router)
 app.include_router(logs.router)
+# Seeding endpoints for verify_setup.py; keep them off in production
+if os.getenv("ENABLE_TEST_FIXTURES", "").lower() in ("1", "true", "yes"):
+    app.include_router(fixtures.router)
 
 # Create uploads directory if not exists
 os.makedirs("uploads", exist_ok=True)
@@ -63,6 +68,7 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 @app.on_event("startup")
 def on_startup():
+    app.state.log_listener = start_queue_logging()
     create_db_and_tables()
     
     # Create default Super Admin user
@@ -118,6 +124,11 @@ def on_startup():
             print(f"✅ Default organization exists: {default_org.name} (ID: {default_org.id})")
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    app.state.log_listener.stop()
+
+
 # Dependency
 def get_db():
     from .database import get_session
@@ -153,13 +164,13 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 
 # --- Projects ---
 @app.post("/projects/", response_model=Project)
-def create_project(project: ProjectBase, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_project(project: ProjectBase, session: Session = Depends(get_session), current_user: User = Depends(get_current_user), rbac_cache: dict = Depends(get_rbac_cache)):
     """Create a new project within an organization."""
     from .services.rbac_service import RBACService
     from .models import UserRoleEnum
     
     # Verify user has access to the organization
-    user_role = RBACService.get_user_role_in_org(current_user.id, project.organization_id, session)
+    user_role = RBACService.get_user_role_in_org(current_user.id, project.organization_id, session, rbac_cache)
     
     if not user_role and current_user.platform_role not in [UserRoleEnum.SUPER_ADMIN.value, UserRoleEnum.PLATFORM_MANAGER.value]:
         raise HTTPException(
@@ -234,7 +245,7 @@ def read_places(session: Session = Depends(get_session), current_user: User = De
 
 # --- Meters ---
 @app.post("/meters/", response_model=Meter)
-def create_meter(meter: MeterBase, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def create_meter(meter: MeterBase, session: Session = Depends(get_session), current_user: User = Depends(get_current_user), rbac_cache: dict = Depends(get_rbac_cache)):
     """Create a new meter within an organization."""
     from .services.rbac_service import RBACService
     from .models import UserRoleEnum, Organization
@@ -252,7 +263,7 @@ def create_meter(meter: MeterBase, session: Session = Depends(get_session), curr
             org_id = 1
     
     # Verify user has access to the organization
-    user_role = RBACService.get_user_role_in_org(current_user.id, org_id, session)
+    user_role = RBACService.get_user_role_in_org(current_user.id, org_id, session, rbac_cache)
     
     if not user_role and current_user.platform_role not in [UserRoleEnum.SUPER_ADMIN.value, UserRoleEnum.PLATFORM_MANAGER.value]:
         raise HTTPException(
@@ -270,7 +281,7 @@ def create_meter(meter: MeterBase, session: Session = Depends(get_session), curr
     return db_meter
 
 @app.delete("/meters/{meter_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_meter(meter_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def delete_meter(meter_id: int, session: Session = Depends(get_session), current_user: User = Depends(get_current_user), rbac_cache: dict = Depends(get_rbac_cache)):
     """Delete a meter."""
     from .services.rbac_service import RBACService
     from .models import UserRoleEnum
@@ -280,7 +291,7 @@ def delete_meter(meter_id: int, session: Session = Depends(get_session), current
         raise HTTPException(status_code=404, detail="Meter not found")
         
     # Verify user has access to the organization
-    user_role = RBACService.get_user_role_in_org(current_user.id, meter.organization_id, session)
+    user_role = RBACService.get_user_role_in_org(current_user.id, meter.organization_id, session, rbac_cache)
     
     # Allow Super Admin, Platform Manager, or Org Manager to delete
     if not (current_user.platform_role in [UserRoleEnum.SUPER_ADMIN.value, UserRoleEnum.PLATFORM_MANAGER.value] or 
@@ -376,7 +387,7 @@ async def upload_reading(
     save_upload_file(file, file_path)
     
     # 3. Process Image
-    reader = SmartMeterReader()
+    reader = get_meter_reader()
     reading_value = reader.read_meter(file_path, expected_value, meter.custom_prompt)
     
     # 4. Save Reading (with organization_id)
@@ -3,6 +3,7 @@ from .rbac import (
     PermissionChecker,
     get_current_user_org_context,
     check_org_access,
+    get_rbac_cache,
     require_super_admin,
     require_platform_manager,
 )
@@ -11,6 +12,7 @@ __all__ = [
     "PermissionChecker",
     "get_current_user_org_context",
     "check_org_access",
+    "get_rbac_cache",
     "require_super_admin",
     "require_platform_manager",
 ]
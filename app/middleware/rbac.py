@@ -1,6 +1,6 @@
 """RBAC middleware and permission checking utilities."""
 from typing import List, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from sqlmodel import Session, select
 from functools import wraps
 
@@ -149,6 +149,19 @@ def check_org_access(user_id: int, organization_id: int, session: Session) -> bo
     return user_org_role is not None
 
 
+def get_rbac_cache(request: Request) -> dict:
+    """
+    Per-request memo for RBACService.get_user_role_in_org.
+    
+    Lives on request.state, so every check within one request shares it and
+    it is discarded with the request.
+    """
+    cache = getattr(request.state, "rbac_cache", None)
+    if cache is None:
+        cache = request.state.rbac_cache = {}
+    return cache
+
+
 # Convenience dependencies for common permission checks
 
 def require_super_admin(
@@ -1,5 +1,5 @@
 from sqlmodel import Field, SQLModel, JSON, Column
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from ..models.base import TimestampMixin
 
@@ -15,6 +15,9 @@ class Log(LogBase, TimestampMixin, table=True):
 class LogCreate(LogBase):
     pass
 
+class LogBulkCreate(SQLModel):
+    events: List[LogCreate]
+
 class LogRead(LogBase):
     id: int
     created_at: datetime
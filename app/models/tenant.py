@@ -14,7 +14,7 @@ class OrganizationBase(SQLModel):
     """Base organization attributes."""
     name: str = Field(index=True)
     subdomain: Optional[str] = Field(default=None, index=True, unique=True)
-    is_active: bool = Field(default=True)
+    is_active: bool = Field(default=True, index=True)
     billing_status: str = Field(default="trial")  # trial, active, suspended, cancelled
 
 
@@ -1,6 +1,7 @@
 """User and RBAC models."""
 from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from .base import TimestampMixin
 
@@ -61,6 +62,11 @@ class UserOrganizationRole(UserOrganizationRoleBase, TimestampMixin, table=True)
     Allows users to have different roles in different organizations.
     Example: A user can be an installer in Org A and org_manager in Org B.
     """
+    # Covers the role lookups, which filter on all three columns
+    __table_args__ = (
+        Index("ix_userorganizationrole_user_org_active", "user_id", "organization_id", "is_active"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Relationships
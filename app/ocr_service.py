@@ -0,0 +1,86 @@
+"""
+Dedicated OCR inference service.
+
+Runs the SmartMeterReader ensemble in its own process so OCR (EasyOCR on a
+GPU box, remote vision-model calls) scales independently of the API workers.
+Start it with:
+
+    uvicorn app.ocr_service:app --host 127.0.0.1 --port 8001
+
+and point the API at it with OCR_REMOTE_URL=http://127.0.0.1:8001.
+"""
+import os
+import tempfile
+from typing import List, Optional
+
+from fastapi import FastAPI, File, Form, UploadFile
+from dotenv import load_dotenv
+
+from .services.ocr import get_smart_meter_reader, save_upload_file
+from .logging_config import start_queue_logging
+
+load_dotenv(".env.local")
+
+app = FastAPI(title="MeterVision OCR Service")
+
+
+@app.on_event("startup")
+def on_startup():
+    app.state.log_listener = start_queue_logging()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    app.state.log_listener.stop()
+
+
+def _save_temp_image(file: UploadFile) -> str:
+    """Persist an uploaded image to a temporary file and return its path."""
+    suffix = os.path.splitext(file.filename or "")[1] or ".jpg"
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    save_upload_file(file, temp_path)
+    return temp_path
+
+
+# Plain `def` endpoints run in FastAPI's threadpool, so blocking OCR calls
+# do not stall the event loop.
+
+@app.post("/ocr")
+def read_meter(
+    file: UploadFile = File(...),
+    expected_value: Optional[str] = Form(None),
+    custom_prompt: Optional[str] = Form(None)
+):
+    """Run the OCR ensemble on an image and return the consensus value."""
+    temp_path = _save_temp_image(file)
+    try:
+        value = get_smart_meter_reader().read_meter(temp_path, expected_value, custom_prompt)
+    finally:
+        os.remove(temp_path)
+    return {"value": value}
+
+
+@app.post("/ocr/batch")
+def read_meters(
+    files: List[UploadFile] = File(...),
+    custom_prompt: Optional[str] = Form(None)
+):
+    """Run the OCR ensemble on several images, batching the EasyOCR pass."""
+    temp_paths = [_save_temp_image(file) for file in files]
+    try:
+        values = get_smart_meter_reader().read_meters(temp_paths, custom_prompt=custom_prompt)
+    finally:
+        for temp_path in temp_paths:
+            os.remove(temp_path)
+    return {"values": values}
+
+
+@app.post("/discover")
+def discover_meter(file: UploadFile = File(...)):
+    """Suggest meter type, serial number and initial reading for an image."""
+    temp_path = _save_temp_image(file)
+    try:
+        return get_smart_meter_reader().discover_meter(temp_path)
+    finally:
+        os.remove(temp_path)
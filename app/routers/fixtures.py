@@ -0,0 +1,110 @@
+"""Test fixture API routes (used by verify_setup.py to seed a full asset chain)."""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel
+
+from ..database import get_session
+from ..models import Project, Customer, Building, Place, Meter, User
+from ..middleware import require_super_admin
+from ..services.rbac_service import OrganizationService
+
+router = APIRouter(prefix="/api/test-fixtures", tags=["test-fixtures"])
+
+
+# --- Request models (parent IDs are filled in by the endpoint) ---
+
+class OrganizationFixture(SQLModel):
+    name: str
+    subdomain: Optional[str] = None
+
+
+class ProjectFixture(SQLModel):
+    name: str
+    description: Optional[str] = None
+
+
+class CustomerFixture(SQLModel):
+    name: str
+    email: Optional[str] = None
+
+
+class BuildingFixture(SQLModel):
+    name: str
+    address: str
+
+
+class PlaceFixture(SQLModel):
+    name: str
+    description: Optional[str] = None
+
+
+class MeterFixture(SQLModel):
+    serial_number: str
+    meter_type: str
+    unit: str
+    location: Optional[str] = None
+
+
+class BulkFixtureCreate(SQLModel):
+    """One organization → project → customer → building → place → meter chain."""
+    organization: OrganizationFixture
+    project: ProjectFixture
+    customer: CustomerFixture
+    building: BuildingFixture
+    place: PlaceFixture
+    meter: MeterFixture
+
+
+@router.post("/bulk")
+def create_fixture_chain(
+    fixtures: BulkFixtureCreate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Create a whole asset chain in one transaction (Super Admin only).
+
+    Replaces six dependent round trips (each waiting for its parent's ID)
+    with one request; each level is flushed to get its ID and everything
+    is committed once at the end.
+    """
+    try:
+        org = OrganizationService.add_organization(
+            fixtures.organization.name, fixtures.organization.subdomain, session
+        )
+
+        project = Project(**fixtures.project.model_dump(), organization_id=org.id)
+        session.add(project)
+        session.flush()
+
+        customer = Customer(**fixtures.customer.model_dump(), project_id=project.id, organization_id=org.id)
+        session.add(customer)
+        session.flush()
+
+        building = Building(**fixtures.building.model_dump(), customer_id=customer.id, organization_id=org.id)
+        session.add(building)
+        session.flush()
+
+        place = Place(**fixtures.place.model_dump(), building_id=building.id, organization_id=org.id)
+        session.add(place)
+        session.flush()
+
+        meter = Meter(**fixtures.meter.model_dump(), place_id=place.id, organization_id=org.id)
+        session.add(meter)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Fixture conflicts with existing data (duplicate subdomain or meter serial?)"
+        )
+
+    return {
+        "organization": {"id": org.id},
+        "project": {"id": project.id},
+        "customer": {"id": customer.id},
+        "building": {"id": building.id},
+        "place": {"id": place.id},
+        "meter": {"id": meter.id, "serial_number": meter.serial_number},
+    }
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from ..database import get_session
 from ..models import User, Meter, InstallationSession
 from ..auth import get_current_user
+from ..middleware import get_rbac_cache
 from ..services.installation_service import InstallationService
 from ..services.camera_service import CameraService
 
@@ -47,7 +48,8 @@ class CompleteInstallationRequest(BaseModel):
 async def start_installation(
     request: StartInstallationRequest,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    rbac_cache: dict = Depends(get_rbac_cache)
 ):
     """
     Start a new installation session.
@@ -64,7 +66,7 @@ async def start_installation(
         from ..models import UserRoleEnum
         
         user_role = RBACService.get_user_role_in_org(
-            current_user.id, request.organization_id, session
+            current_user.id, request.organization_id, session, rbac_cache
         )
         
         if not user_role and current_user.platform_role not in [
@@ -134,7 +136,7 @@ async def analyze_installation_image(
     """
     import os
     import uuid
-    from ..services.ocr import SmartMeterReader, save_upload_file
+    from ..services.ocr import get_meter_reader, save_upload_file
     
     # Save temporary file
     file_ext = file.filename.split(".")[-1]
@@ -142,7 +144,7 @@ async def analyze_installation_image(
     save_upload_file(file, temp_path)
     
     try:
-        reader = SmartMeterReader()
+        reader = get_meter_reader()
         discovery = reader.discover_meter(temp_path)
         
         # Keep temp file for verification if needed, or delete
@@ -162,7 +164,8 @@ async def analyze_installation_image(
 async def run_validation(
     session_id: int,
     db_session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    rbac_cache: dict = Depends(get_rbac_cache)
 ):
     """
     Run the validation pipeline for an installation session.
@@ -188,7 +191,7 @@ async def run_validation(
             from ..models import UserRoleEnum
             
             user_role = RBACService.get_user_role_in_org(
-                current_user.id, installation.organization_id, db_session
+                current_user.id, installation.organization_id, db_session, rbac_cache
             )
             
             if not user_role and current_user.platform_role not in [
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from sqlmodel import Session
 from ..database import get_session
-from ..models.log import Log, LogCreate, LogRead
+from ..models.log import Log, LogBulkCreate, LogCreate, LogRead
 from ..services import log_service
 from ..auth import get_current_user
 from ..models import User
@@ -24,6 +24,15 @@ def create_new_log(log: LogCreate, session: Session = Depends(get_session)):
     created_log = log_service.create_log(session=session, log=log)
     return created_log
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+def create_logs_bulk(batch: LogBulkCreate, session: Session = Depends(get_session)):
+    """
+    Create several log entries in one request, e.g. every event produced
+    while processing one camera snapshot.
+    """
+    created = log_service.create_logs(session=session, logs=batch.events)
+    return {"created": created}
+
 @router.get("/", response_model=List[LogRead])
 def read_logs(
     skip: int = 0,
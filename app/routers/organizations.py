@@ -8,7 +8,7 @@ from ..models import (
     Organization, OrganizationBase, OrganizationRead,
     User, UserRoleEnum, UserOrganizationRole, UserOrganizationRoleBase
 )
-from ..middleware import require_super_admin, require_platform_manager, get_current_user_org_context
+from ..middleware import require_super_admin, require_platform_manager, get_current_user_org_context, get_rbac_cache
 from ..services.rbac_service import OrganizationService, RBACService
 from ..auth import get_current_user
 
@@ -74,7 +74,8 @@ def assign_user_to_organization(
     organization_id: int,
     assignment: UserAssignment,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    rbac_cache: dict = Depends(get_rbac_cache)
 ):
     """
     Assign a user to an organization with a role.
@@ -82,7 +83,7 @@ def assign_user_to_organization(
     Requires ORG_MANAGER role or higher.
     """
     # Check permission
-    user_role = RBACService.get_user_role_in_org(current_user.id, organization_id, session)
+    user_role = RBACService.get_user_role_in_org(current_user.id, organization_id, session, rbac_cache)
     
     if user_role not in [
         UserRoleEnum.SUPER_ADMIN.value,
@@ -140,11 +141,12 @@ def remove_user_from_organization(
     organization_id: int,
     user_id: int,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    rbac_cache: dict = Depends(get_rbac_cache)
 ):
     """Remove a user from an organization."""
     # Check permission
-    user_role = RBACService.get_user_role_in_org(current_user.id, organization_id, session)
+    user_role = RBACService.get_user_role_in_org(current_user.id, organization_id, session, rbac_cache)
     
     if user_role not in [
         UserRoleEnum.SUPER_ADMIN.value,
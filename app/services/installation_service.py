@@ -9,7 +9,7 @@ This service manages:
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from sqlmodel import Session, select
 import json
 
@@ -100,6 +100,8 @@ class InstallationService:
             raise ValueError(f"Installation session {installation_session_id} not found")
         
         camera = session.get(Camera, installation.camera_id)
+        # All checks of one run share a single timestamp
+        now = datetime.utcnow()
         # Initialize all results with a default "not_run" state to prevent frontend crashes
         results = {
             "connection": {"passed": False, "message": "Waiting..."},
@@ -110,7 +112,7 @@ class InstallationService:
         
         # Step 1: Connection Test
         connection_check = InstallationService._run_connection_test(
-            camera, installation, session
+            camera, installation, session, now
         )
         results["connection"] = connection_check
         
@@ -127,9 +129,11 @@ class InstallationService:
         
         # Step 2: FOV Validation
         test_image_path = CameraService.capture_test_image(camera.serial_number)
+        # The checks share one loader, so the capture is decoded at most once per run
+        load_image = ImageValidationService.image_loader(test_image_path)
         
         fov_check = InstallationService._run_fov_validation(
-            test_image_path, installation, session
+            test_image_path, installation, session, now, load_image=load_image
         )
         results["fov"] = fov_check
         
@@ -146,7 +150,7 @@ class InstallationService:
         
         # Step 3: Glare Detection
         glare_check = InstallationService._run_glare_detection(
-            test_image_path, installation, session
+            test_image_path, installation, session, now, load_image=load_image
         )
         results["glare"] = glare_check
         
@@ -156,7 +160,7 @@ class InstallationService:
         
         # Step 4: Initial OCR Reading
         ocr_check = InstallationService._run_ocr_validation(
-            test_image_path, installation, session
+            test_image_path, installation, session, now, load_image=load_image
         )
         results["ocr"] = ocr_check
         
@@ -176,7 +180,8 @@ class InstallationService:
     def _run_connection_test(
         camera: Camera,
         installation: InstallationSession,
-        session: Session
+        session: Session,
+        now: datetime
     ) -> Dict[str, Any]:
         """Run connection test validation."""
         check_result = CameraService.check_connection(camera.serial_number, session)
@@ -186,7 +191,7 @@ class InstallationService:
             check_type=ValidationTypeEnum.CONNECTION.value,
             status="PASSED" if check_result["connected"] else "FAILED",
             result_json=json.dumps(check_result),
-            checked_at=datetime.utcnow()
+            checked_at=now
         )
         
         session.add(validation_check)
@@ -202,17 +207,19 @@ class InstallationService:
     def _run_fov_validation(
         image_path: str,
         installation: InstallationSession,
-        session: Session
+        session: Session,
+        now: datetime,
+        load_image: Optional[Callable[[], Any]] = None
     ) -> Dict[str, Any]:
         """Run FOV validation."""
-        fov_result = ImageValidationService.validate_fov(image_path)
+        fov_result = ImageValidationService.validate_fov(image_path, load_image=load_image)
         
         validation_check = ValidationCheck(
             installation_session_id=installation.id,
             check_type=ValidationTypeEnum.FOV.value,
             status="PASSED" if fov_result.passed else "FAILED",
             result_json=json.dumps(fov_result.to_dict()),
-            checked_at=datetime.utcnow()
+            checked_at=now
         )
         
         session.add(validation_check)
@@ -229,17 +236,19 @@ class InstallationService:
     def _run_glare_detection(
         image_path: str,
         installation: InstallationSession,
-        session: Session
+        session: Session,
+        now: datetime,
+        load_image: Optional[Callable[[], Any]] = None
     ) -> Dict[str, Any]:
         """Run glare detection."""
-        glare_result = ImageValidationService.detect_glare(image_path)
+        glare_result = ImageValidationService.detect_glare(image_path, load_image=load_image)
         
         validation_check = ValidationCheck(
             installation_session_id=installation.id,
             check_type=ValidationTypeEnum.GLARE.value,
             status="PASSED" if glare_result.passed else "FAILED",
             result_json=json.dumps(glare_result.to_dict()),
-            checked_at=datetime.utcnow()
+            checked_at=now
         )
         
         session.add(validation_check)
@@ -256,17 +265,19 @@ class InstallationService:
     def _run_ocr_validation(
         image_path: str,
         installation: InstallationSession,
-        session: Session
+        session: Session,
+        now: datetime,
+        load_image: Optional[Callable[[], Any]] = None
     ) -> Dict[str, Any]:
         """Run OCR validation."""
-        ocr_result = ImageValidationService.validate_initial_reading(image_path)
+        ocr_result = ImageValidationService.validate_initial_reading(image_path, load_image=load_image)
         
         validation_check = ValidationCheck(
             installation_session_id=installation.id,
             check_type=ValidationTypeEnum.INITIAL_OCR.value,
             status="PASSED" if ocr_result.passed else "FAILED",
             result_json=json.dumps(ocr_result.to_dict()),
-            checked_at=datetime.utcnow()
+            checked_at=now
         )
         
         session.add(validation_check)
@@ -301,9 +312,10 @@ class InstallationService:
         if not installation:
             raise ValueError(f"Installation session {installation_session_id} not found")
         
+        now = datetime.utcnow()
         if installer_confirmed:
             installation.status = InstallationStatusEnum.COMPLETED.value
-            installation.completed_at = datetime.utcnow()
+            installation.completed_at = now
             
             # Update camera status to ACTIVE and link to meter
             camera = session.get(Camera, installation.camera_id)
@@ -314,7 +326,7 @@ class InstallationService:
                 session.add(camera)
         else:
             installation.status = InstallationStatusEnum.FAILED.value
-            installation.completed_at = datetime.utcnow()
+            installation.completed_at = now
         
         session.add(installation)
         session.commit()
@@ -346,7 +358,7 @@ class InstallationService:
         validation_checks = session.exec(
             select(ValidationCheck)
             .where(ValidationCheck.installation_session_id == installation_session_id)
-            .order_by(ValidationCheck.checked_at)
+            .order_by(ValidationCheck.checked_at, ValidationCheck.id)
         ).all()
         
         return {
@@ -1,3 +1,4 @@
+from typing import List
 from sqlmodel import Session
 from ..models.log import Log, LogCreate
 
@@ -10,3 +11,11 @@ def create_log(session: Session, log: LogCreate) -> Log:
     session.commit()
     session.refresh(db_log)
     return db_log
+
+def create_logs(session: Session, logs: List[LogCreate]) -> int:
+    """
+    Creates several log entries in one transaction and returns how many were stored.
+    """
+    session.add_all([Log.model_validate(log) for log in logs])
+    session.commit()
+    return len(logs)
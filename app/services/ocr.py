@@ -1,21 +1,309 @@
 import shutil
 import os
+import subprocess
+import tempfile
+import io
+import hashlib
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from abc import ABC, abstractmethod
-from typing import Optional
+from functools import lru_cache, wraps
+from typing import List, Optional
 import requests
 import base64
+import orjson
+from rapidfuzz import fuzz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
 
 import pytesseract
 from PIL import Image
-import easyocr
+try:
+    # Optional: binds libtesseract in-process instead of spawning the binary per image
+    import tesserocr
+except ImportError:
+    tesserocr = None
+try:
+    # Optional: libjpeg-turbo's SIMD decoder, several times faster than Pillow's
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbojpeg = None
+import numpy as np
 import re
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.api_core import retry as google_retry
+
+logger = logging.getLogger(__name__)
+
+# Meter displays occupy a small part of the frame, so full camera resolution
+# only costs OCR time and upload bandwidth.
+OCR_MAX_DIM = 1024
+JPEG_QUALITY = 85
+# Self-reported Gemma confidence at which a discovered reading stands in for
+# a full ensemble read of the same image
+DISCOVERY_CONFIDENCE_THRESHOLD = 0.9
+
+# Strips everything but digits and decimal separators from OCR output
+_DIGIT_FILTER = re.compile(r'[^0-9.,]')
+_COMMA_TO_DOT = str.maketrans(",", ".")
+# First number in a model answer, used when the plain cleanup finds nothing
+_NUMBER_SEARCH = re.compile(r'(\d+[.,]\d+|\d+)')
+# Letters OCR engines commonly return for digits, plus separators to drop or unify
+_OCR_CONFUSIONS = str.maketrans({
+    'O': '0', 'o': '0', 'l': '1', 'I': '1', 'S': '5', 'B': '8', ' ': '', ',': '.',
+})
+# partial_ratio score at which the expected reading counts as found in OCR text
+_EXPECTED_MATCH_SCORE = 90
+# JSON object inside a markdown code fence, as models like to wrap their answers
+_JSON_BLOCK = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+# A cleaned segment that float() accepts: digits with at most one decimal point
+_NUM_RE = re.compile(r'^\d+(?:\.\d+)?$')
+
+# Consensus weights for SmartMeterReader, in order of trust. Dict order is
+# also the fallback priority when no value gathers enough votes.
+_VOTE_WEIGHTS = {
+    "gemma_27b": 3,
+    "gemma_12b": 2,
+    "qwen": 2,
+    "easy": 1,
+    "tess": 1,
+}
+# Score a value needs to win outright: Gemma 27B alone, or any agreement
+# between two models other than the two local engines
+_VOTE_THRESHOLD = 3
+# Values matching the calibration reading clear the threshold on their own
+_EXPECTED_BONUS = _VOTE_THRESHOLD
+
+_remote_slots_sem: Optional[threading.BoundedSemaphore] = None
+_remote_slots_lock = threading.Lock()
+
+def _remote_slots() -> threading.BoundedSemaphore:
+    """
+    Cap concurrent calls to the remote vision-model APIs across all requests,
+    so bursts of uploads stay within the providers' rate limits.
+
+    Created on first use rather than at import, because the entry points load
+    .env after importing this module.
+    """
+    global _remote_slots_sem
+    with _remote_slots_lock:
+        if _remote_slots_sem is None:
+            _remote_slots_sem = threading.BoundedSemaphore(int(os.getenv("OCR_REMOTE_CONCURRENCY", "4")))
+        return _remote_slots_sem
+
+def _call_remote(read, *args) -> float:
+    """Run a remote backend call while holding one of the shared API slots."""
+    with _remote_slots():
+        return read(*args)
+
+# Longest Retry-After (seconds) honoured between OpenRouter attempts
+_RETRY_AFTER_CAP = 5.0
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After, but never sleeps longer than _RETRY_AFTER_CAP."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, _RETRY_AFTER_CAP)
+
+# Rate-limit and transient server responses are retried with exponential
+# backoff (urllib3 retries at once, then waits 1s and 2s, or a Retry-After of
+# at most 5s); anything else (bad key, malformed request) fails the same way
+# on every attempt. POST is not retried by default, but model calls have no
+# side effects worth protecting. Read timeouts are not retried: the caller
+# holds one of the _remote_slots() permits throughout, and a model that already took
+# the full timeout would only hold it again.
+_OPENROUTER_RETRY = _CappedRetry(
+    total=3,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503],
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Same policy for the Gemini SDK: quota exhaustion and transient server errors
+_GENAI_RETRY = google_retry.Retry(
+    predicate=google_retry.if_exception_type(
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+    ),
+    initial=1.0,
+    maximum=8.0,
+    multiplier=2.0,
+    timeout=60.0,
+)
+
+# API key the genai module was last configured with
+_genai_api_key: Optional[str] = None
+
+def _configure_genai(api_key: str) -> None:
+    """
+    Configure the Google Generative AI client once per process.
+
+    genai.configure() throws away the cached clients, so calling it for every
+    reader would also drop the open connection to the API.
+    """
+    global _genai_api_key
+    if _genai_api_key != api_key:
+        genai.configure(api_key=api_key)
+        _genai_api_key = api_key
+
+def _parse_expected(expected_value: Optional[str]) -> Optional[float]:
+    """Parse a calibration value such as "1234,5"; None if absent or malformed."""
+    if not expected_value:
+        return None
+    try:
+        return float(expected_value.replace(",", "."))
+    except ValueError:
+        return None
+
+def _matches_expected(value: float, expected: float) -> bool:
+    """True if an OCR value is within 0.1% of the expected reading."""
+    return value > 0 and abs(value - expected) / max(expected, 1) < 0.001
+
+def _clean_digits(text: str) -> str:
+    """Keep only digits and decimal separators, normalising commas to dots."""
+    return _DIGIT_FILTER.sub('', text).translate(_COMMA_TO_DOT)
+
+def _parse_model_number(text: str) -> float:
+    """Extract the reading from a vision model's answer; 0.0 if it has none."""
+    cleaned_text = _clean_digits(text)
+    if not cleaned_text:
+        match = _NUMBER_SEARCH.search(text)
+        if not match:
+            return 0.0
+        cleaned_text = match.group(1).translate(_COMMA_TO_DOT)
+    return float(cleaned_text)
+
+def _normalize_digits(text: str) -> str:
+    """Map look-alike letters to digits and drop spaces, e.g. "l2O4,5" -> "1204.5"."""
+    return text.translate(_OCR_CONFUSIONS)
+
+def _contains_expected(text: str, clean_expected: str) -> bool:
+    """True if the (normalised) expected reading appears in OCR text, allowing small misreads.
+
+    partial_ratio scores a fragment like "45" or "2345.6" as a perfect match
+    for "12345.6", so the OCR digits must be at least as long as the expected
+    reading before fuzzy matching counts; a dropped digit changes the value.
+    """
+    digits = _clean_digits(_normalize_digits(text))
+    if len(digits) < len(clean_expected):
+        return False
+    return fuzz.partial_ratio(clean_expected, digits) >= _EXPECTED_MATCH_SCORE
+
+def _load_image(image_path: str) -> Image.Image:
+    """Open and fully decode an image so it can be shared between readers."""
+    if _turbojpeg is not None and image_path.lower().endswith((".jpg", ".jpeg")):
+        with open(image_path, "rb") as f:
+            return Image.fromarray(_turbojpeg.decode(f.read(), pixel_format=TJPF_RGB))
+    image = Image.open(image_path)
+    image.load()
+    return image
+
+def _prep_for_ocr(image: Image.Image, max_dim: int = OCR_MAX_DIM, grayscale: bool = True) -> Image.Image:
+    """Return a copy of image downscaled to at most max_dim pixels on its long edge."""
+    # convert() always returns a new image, so the caller's copy stays untouched
+    image = image.convert("L" if grayscale else "RGB")
+    image.thumbnail((max_dim, max_dim), Image.LANCZOS)
+    return image
+
+def _to_jpeg_bytes(image: Image.Image, quality: int = JPEG_QUALITY) -> bytes:
+    """Encode an image as JPEG in memory for upload to a vision model."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+@lru_cache(maxsize=32)
+def _resized_jpeg(image_path: str, mtime_ns: int, max_side: int, quality: int) -> bytes:
+    # mtime is part of the key so a rewritten file is encoded again
+    return _to_jpeg_bytes(_prep_for_ocr(_load_image(image_path), max_dim=max_side, grayscale=False), quality)
+
+def _prepare_image_bytes(image_path: str, max_side: int = OCR_MAX_DIM, quality: int = JPEG_QUALITY) -> bytes:
+    """
+    Downscaled JPEG of an image file for upload to a remote vision model.
+
+    The result is cached per file version, so every remote model in the
+    ensemble uploads the same bytes without re-decoding the capture.
+    """
+    return _resized_jpeg(image_path, os.stat(image_path).st_mtime_ns, max_side, quality)
+
+@lru_cache(maxsize=256)
+def _digest_for(image_path: str, mtime_ns: int, size: int) -> str:
+    # mtime and size are part of the key so a rewritten file is hashed again
+    sha = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _file_digest(image_path: str) -> str:
+    """SHA-256 of an image file, computed once per file version."""
+    st = os.stat(image_path)
+    return _digest_for(image_path, st.st_mtime_ns, st.st_size)
+
+# Readings keyed by (reader class, model, image digest, expected value, prompt).
+# Shared across requests so validation-then-read flows and re-uploads of the
+# same capture skip every backend call.
+_READING_CACHE = TTLCache(maxsize=512, ttl=3600)
+_READING_CACHE_LOCK = threading.Lock()
+
+def _reading_cache_key(reader, digest: str, expected_value: Optional[str], custom_prompt: Optional[str]) -> tuple:
+    return (type(reader).__name__, getattr(reader, "model_name", "") or "", digest, expected_value, custom_prompt)
+
+def memoize_by_filehash(read_meter):
+    """Cache a read_meter implementation by the content of the image file."""
+    @wraps(read_meter)
+    def wrapper(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
+        try:
+            digest = _file_digest(image_path)
+        except OSError:
+            # Let the reader report the unreadable file as it always has
+            return read_meter(self, image_path, expected_value, custom_prompt)
+
+        key = _reading_cache_key(self, digest, expected_value, custom_prompt)
+        with _READING_CACHE_LOCK:
+            cached = _READING_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        value = read_meter(self, image_path, expected_value, custom_prompt)
+        # 0.0 means the backend failed; leave it uncached so the next call retries
+        if value:
+            with _READING_CACHE_LOCK:
+                _READING_CACHE[key] = value
+        return value
+    return wrapper
 
 class MeterReader(ABC):
     @abstractmethod
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         pass
 
+    def read_meter_image(self, image: Image.Image, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
+        """
+        Read the meter from an already decoded image.
+
+        Lets SmartMeterReader decode a capture once and share it between
+        backends. Readers that can work on pixels override this; the default
+        writes the image to a temporary file and hands it to read_meter.
+        """
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
+            image.save(tmp, format="JPEG", quality=95)
+        try:
+            return self.read_meter(tmp.name, expected_value, custom_prompt)
+        finally:
+            os.remove(tmp.name)
+
 class MockMeterReader(MeterReader):
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         # Simulate processing time or just return a static value
@@ -24,71 +312,206 @@ class MockMeterReader(MeterReader):
         return 12345.67
 
 class TesseractMeterReader(MeterReader):
+    def __init__(self):
+        # A persistent engine avoids a fork/exec and a reload of the language
+        # data for every image; pytesseract is the fallback when unavailable.
+        self._api = None
+        self._lock = threading.Lock()
+        if tesserocr is not None:
+            try:
+                self._api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_LINE)
+            except RuntimeError as e:
+                logger.warning("tesserocr unavailable, falling back to pytesseract: %s", e)
+
+    def _image_to_string(self, image: Image.Image) -> str:
+        if self._api is None:
+            return pytesseract.image_to_string(image, config='--psm 7')
+        # The engine keeps per-image state, so calls must not interleave
+        with self._lock:
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text()
+
+    @memoize_by_filehash
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         try:
-            image = Image.open(image_path)
-            text = pytesseract.image_to_string(image, config='--psm 7')
-            
-            # Calibration: Check if expected value is present
-            if expected_value:
-                # Basic fuzzy match: remove spaces and check existence
-                clean_ocr = text.replace(" ", "").replace(",", ".")
-                clean_expected = expected_value.replace(" ", "").replace(",", ".")
-                if clean_expected in clean_ocr:
-                    return float(expected_value)
+            image = _load_image(image_path)
+        except Exception:
+            logger.exception("Error processing image with Tesseract")
+            return 0.0
+        return self.read_meter_image(image, expected_value, custom_prompt)
 
-            cleaned_text = "".join([c for c in text if c.isdigit() or c in ['.', ',']])
-            cleaned_text = cleaned_text.replace(',', '.')
-            if not cleaned_text:
-                return 0.0
-            return float(cleaned_text)
-        except Exception as e:
-            print(f"Error processing image with Tesseract: {e}")
+    def read_meter_image(self, image: Image.Image, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
+        try:
+            return self._parse_text(self._image_to_string(_prep_for_ocr(image)), expected_value)
+        except Exception:
+            logger.exception("Error processing image with Tesseract")
+            return 0.0
+
+    def read_meters(self, image_paths: List[str], expected_values: Optional[List[Optional[str]]] = None) -> List[float]:
+        """
+        Read several meter images with a single Tesseract process.
+
+        Tesseract accepts a text file listing image paths and loads its
+        language data once for the whole list, instead of once per image.
+        The list points at copies prepared with _prep_for_ocr, so every image
+        gets the same input as read_meter_image would give it.
+
+        Args:
+            image_paths: Paths to the meter images
+            expected_values: Optional calibration value per image
+
+        Returns:
+            One reading per image, 0.0 where nothing was recognised
+        """
+        if not image_paths:
+            return []
+        expected_values = expected_values or [None] * len(image_paths)
+
+        work_dir = tempfile.mkdtemp(prefix="tess-batch-")
+        try:
+            # PNG is lossless, so Tesseract sees exactly the prepared pixels
+            prepped_paths = []
+            for i, path in enumerate(image_paths):
+                prepped_path = os.path.join(work_dir, f"{i}.png")
+                _prep_for_ocr(_load_image(path)).save(prepped_path, format="PNG")
+                prepped_paths.append(prepped_path)
+            list_path = os.path.join(work_dir, "images.txt")
+            with open(list_path, "w") as list_file:
+                list_file.write("\n".join(prepped_paths) + "\n")
+            result = subprocess.run(
+                [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout", "--psm", "7"],
+                capture_output=True, text=True, check=True
+            )
+            # Each page's text is terminated by a form feed
+            pages = result.stdout.split("\f")
+            if len(pages) < len(image_paths):
+                raise RuntimeError(f"expected {len(image_paths)} pages, got {len(pages)}")
+        except Exception:
+            logger.exception("Batched Tesseract failed, reading images one by one")
+            return [self.read_meter(path, expected) for path, expected in zip(image_paths, expected_values)]
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        readings = []
+        for text, expected in zip(pages, expected_values):
+            try:
+                readings.append(self._parse_text(text, expected))
+            except ValueError:
+                readings.append(0.0)
+        return readings
+
+    @staticmethod
+    def _parse_text(text: str, expected_value: Optional[str] = None) -> float:
+        """Turn Tesseract output into a reading, preferring the expected value when present."""
+        # Calibration: Check if expected value is present
+        if expected_value:
+            if _contains_expected(text, _normalize_digits(expected_value)):
+                return float(expected_value)
+
+        cleaned_text = _clean_digits(text)
+        if not cleaned_text:
             return 0.0
+        return float(cleaned_text)
 
 class EasyOCRMeterReader(MeterReader):
     def __init__(self):
-        self.reader = easyocr.Reader(['en'])
+        # Importing torch and loading the detection/recognition models takes
+        # several seconds, so do it in the background and only block the
+        # first read that actually needs the model.
+        self._reader_future: Future = Future()
+        threading.Thread(target=self._load, name="easyocr-load", daemon=True).start()
 
+    def _load(self):
+        try:
+            import easyocr
+
+            options = {}
+            # With the models pre-installed, skip the per-start download check
+            model_dir = os.getenv("EASYOCR_MODEL_DIR")
+            if model_dir:
+                options = {"model_storage_directory": model_dir, "download_enabled": False}
+            self._reader_future.set_result(easyocr.Reader(['en'], **options))
+        except BaseException as e:
+            logger.exception("Failed to load EasyOCR")
+            self._reader_future.set_exception(e)
+
+    @property
+    def reader(self):
+        """The EasyOCR Reader, waiting for the background load if needed."""
+        return self._reader_future.result()
+
+    @memoize_by_filehash
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         try:
             results = self.reader.readtext(image_path, detail=0)
-            
-            # Calibration: Check if expected value is present in any segment
-            if expected_value:
-                clean_expected = expected_value.replace(" ", "").replace(",", ".")
-                for text in results:
-                    clean_ocr = text.replace(" ", "").replace(",", ".")
-                    # Allow fuzzy match or exact contained match
-                    if clean_expected in clean_ocr:
-                        return float(expected_value)
-            
-            best_candidate = 0.0
-            max_digits = 0
-            
+            return self._best_candidate(results, expected_value)
+        except Exception:
+            logger.exception("Error processing image with EasyOCR")
+            return 0.0
+
+    def read_meter_image(self, image: Image.Image, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
+        try:
+            # EasyOCR takes arrays directly, skipping its own file decode
+            rgb = image if image.mode == "RGB" else image.convert("RGB")
+            results = self.reader.readtext(np.asarray(rgb), detail=0)
+            return self._best_candidate(results, expected_value)
+        except Exception:
+            logger.exception("Error processing image with EasyOCR")
+            return 0.0
+
+    def read_meters_batch(self, image_paths: List[str], expected_values: Optional[List[Optional[str]]] = None,
+                          n_width: int = 800, n_height: int = 600) -> List[float]:
+        """
+        Read several meter images in one batched EasyOCR pass.
+
+        Args:
+            image_paths: Paths to the meter images
+            expected_values: Optional calibration value per image
+            n_width: Width every image is resized to for the batch
+            n_height: Height every image is resized to for the batch
+
+        Returns:
+            One reading per image, 0.0 where nothing was recognised
+        """
+        if not image_paths:
+            return []
+        expected_values = expected_values or [None] * len(image_paths)
+        try:
+            batch_results = self.reader.readtext_batched(image_paths, n_width=n_width, n_height=n_height, detail=0)
+        except Exception:
+            logger.exception("Batched EasyOCR failed, reading images one by one")
+            return [self.read_meter(path, expected) for path, expected in zip(image_paths, expected_values)]
+        return [
+            self._best_candidate(results, expected)
+            for results, expected in zip(batch_results, expected_values)
+        ]
+
+    @staticmethod
+    def _best_candidate(results: list, expected_value: Optional[str] = None) -> float:
+        """Pick the most meter-like number among the detected text segments."""
+        # Calibration: Check if expected value is present in any segment
+        if expected_value:
+            clean_expected = _normalize_digits(expected_value)
             for text in results:
-                cleaned_text = "".join([c for c in text if c.isdigit() or c in ['.', ',']])
-                cleaned_text = cleaned_text.replace(',', '.')
-                if not cleaned_text or cleaned_text.count('.') > 1:
-                    continue
-                try:
-                    val = float(cleaned_text)
-                    num_digits = len(cleaned_text.replace('.', ''))
-                    score = num_digits
-                    if '.' in cleaned_text:
-                        score += 2 
-                    
-                    if score > max_digits and val < 1000000:
-                        max_digits = score
-                        best_candidate = val
-                except ValueError:
-                    continue
-
-            return best_candidate
-        except Exception as e:
-            print(f"Error processing image with EasyOCR: {e}")
+                if _contains_expected(text, clean_expected):
+                    return float(expected_value)
+        
+        candidates = [c for c in map(_clean_digits, results) if _NUM_RE.match(c)]
+        if not candidates:
             return 0.0
 
+        # Score every candidate at once: one point per digit, two extra for a
+        # decimal point (more meter-like); implausibly large values never win
+        values = np.array([float(c) for c in candidates], dtype=np.float64)
+        texts = np.array(candidates)
+        has_decimal = np.char.count(texts, '.')
+        scores = np.char.str_len(texts) - has_decimal + 2 * has_decimal
+        scores = np.where(values < 1000000, scores, 0)
+
+        # argmax returns the first maximum, so earlier segments win ties
+        best = int(np.argmax(scores))
+        return float(values[best]) if scores[best] > 0 else 0.0
+
 
 
 class GemmaGoogleMeterReader(MeterReader):
@@ -98,41 +521,30 @@ class GemmaGoogleMeterReader(MeterReader):
         self.model_name = model_name
 
         if not self.api_key:
-            print("Warning: GEMINI_API_KEY (for Gemma Google) not found in environment variables.")
+            logger.warning("GEMINI_API_KEY (for Gemma Google) not found in environment variables.")
             self.model = None
         else:
-            genai.configure(api_key=self.api_key)
-            print(f"Initializing GemmaGoogleMeterReader with model: {self.model_name}")
+            _configure_genai(self.api_key)
+            logger.info("Initializing GemmaGoogleMeterReader with model: %s", self.model_name)
             self.model = genai.GenerativeModel(self.model_name)
 
+    @memoize_by_filehash
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         if not self.model:
              return 0.0
-        
+
         try:
-            image = Image.open(image_path)
+            image_part = {"mime_type": "image/jpeg", "data": _prepare_image_bytes(image_path)}
             prompt = custom_prompt if custom_prompt else "Read the numeric value from this meter. Return ONLY the number. If you are unsure, return 0. Ignore any non-numeric text."
             if expected_value:
                 prompt += f" The expected value is close to {expected_value}."
             
-            response = self.model.generate_content([prompt, image])
-            text = response.text.strip()
-            
-            # Basic cleanup
-            cleaned_text = "".join([c for c in text if c.isdigit() or c in ['.', ',']])
-            cleaned_text = cleaned_text.replace(',', '.')
-            
-            if not cleaned_text:
-                # More aggressive regex for Gemma
-                match = re.search(r'(\d+[.,]\d+|\d+)', text)
-                if match:
-                    cleaned_text = match.group(1).replace(',', '.')
-                else:
-                    return 0.0
-            
-            return float(cleaned_text)
-        except Exception as e:
-            print(f"Error processing image with Gemma Google ({self.model_name}): {e}")
+            response = self.model.generate_content(
+                [prompt, image_part], request_options={"retry": _GENAI_RETRY}
+            )
+            return _parse_model_number(response.text.strip())
+        except Exception:
+            logger.exception("Error processing image with Gemma Google (%s)", self.model_name)
             return 0.0
 
 class OpenRouterMeterReader(MeterReader):
@@ -142,27 +554,32 @@ class OpenRouterMeterReader(MeterReader):
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
 
         if not self.api_key:
-            print("Warning: OPENROUTER_API_KEY not found in environment variables.")
-
+            logger.warning("OPENROUTER_API_KEY not found in environment variables.")
+
+        # A pooled keep-alive session pays the TLS handshake once per worker
+        # instead of once per image
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_OPENROUTER_RETRY))
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": "https://metervision.local",
+            "X-Title": "MeterVision"
+        })
+
+    @memoize_by_filehash
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         if not self.api_key:
             return 0.0
 
         try:
-            with open(image_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+            # Phone captures run to several MB; a downscaled JPEG keeps the
+            # digits legible while shrinking the upload and the base64 copy.
+            encoded_string = base64.b64encode(_prepare_image_bytes(image_path)).decode('ascii')
 
             prompt = custom_prompt if custom_prompt else "Read the numeric value from this meter. Return ONLY the number. If you are unsure, return 0. Ignore any non-numeric text."
             if expected_value:
                 prompt += f" The expected value is close to {expected_value}."
 
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://metervision.local",
-                "X-Title": "MeterVision"
-            }
-
             payload = {
                 "model": self.model_name,
                 "messages": [
@@ -184,29 +601,17 @@ class OpenRouterMeterReader(MeterReader):
                 ]
             }
 
-            response = requests.post(self.api_url, headers=headers, json=payload)
+            response = self._session.post(self.api_url, json=payload, timeout=60)
             response.raise_for_status()
             
             result_json = response.json()
             if 'choices' in result_json and len(result_json['choices']) > 0:
-                text = result_json['choices'][0]['message']['content'].strip()
-                
-                # Basic cleanup
-                cleaned_text = "".join([c for c in text if c.isdigit() or c in ['.', ',']])
-                cleaned_text = cleaned_text.replace(',', '.')
-                
-                if not cleaned_text:
-                    match = re.search(r'(\d+[.,]\d+|\d+)', text)
-                    if match:
-                        cleaned_text = match.group(1).replace(',', '.')
-                    else:
-                        return 0.0
-                return float(cleaned_text)
+                return _parse_model_number(result_json['choices'][0]['message']['content'].strip())
             else:
                 return 0.0
 
-        except Exception as e:
-            print(f"Error processing image with OpenRouter ({self.model_name}): {e}")
+        except Exception:
+            logger.exception("Error processing image with OpenRouter (%s)", self.model_name)
             return 0.0
 
 class SmartMeterReader(MeterReader):
@@ -221,114 +626,279 @@ class SmartMeterReader(MeterReader):
         # Qwen via OpenRouter
         self.qwen_vl = OpenRouterMeterReader(model_name="qwen/qwen-2.5-vl-7b-instruct:free")
 
+        # The backends spend their time in C extensions or waiting on the
+        # network, so running them on threads overlaps them despite the GIL.
+        # This reader is shared process-wide, so local and remote backends get
+        # separate pools: a request's EasyOCR/Tesseract work never queues
+        # behind other requests' slow API calls. _remote_slots() still throttles
+        # the remote calls themselves.
+        self._local_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("OCR_LOCAL_WORKERS", "4")), thread_name_prefix="ocr-local"
+        )
+        self._remote_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("OCR_REMOTE_WORKERS", "12")), thread_name_prefix="ocr-remote"
+        )
+
+    @memoize_by_filehash
     def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
-        val_easy = self.easyocr.read_meter(image_path, expected_value, custom_prompt)
-        val_tess = self.tesseract.read_meter(image_path, expected_value, custom_prompt)
-
-        val_gemma_27b = self.gemma_27b.read_meter(image_path, expected_value, custom_prompt)
-        val_gemma_12b = self.gemma_12b.read_meter(image_path, expected_value, custom_prompt)
-        val_qwen = self.qwen_vl.read_meter(image_path, expected_value, custom_prompt)
-        
-        print(f"OCR Results - Tesseract: {val_tess}, EasyOCR: {val_easy}, Gemma 27B (Google): {val_gemma_27b}, Gemma 12B (OR): {val_gemma_12b}, Qwen2.5-VL: {val_qwen}")
-        
-        # If expected value was matched by any, verify and return it
-        if expected_value:
-            try:
-                exp_float = float(expected_value.replace(",", "."))
-                results = [val_easy, val_tess, val_gemma_27b, val_gemma_12b, val_qwen]
-                if exp_float > 0 and exp_float in results:
-                    return exp_float
-            except:
-                pass
-
-        # Voting / Consensus Logic
-        
-        # 0. Collect all positive results from AI models
-        ai_results = [v for v in [val_gemma_27b, val_gemma_12b, val_qwen] if v > 0]
-        
-        # If all agree (highly unlikely)
-
-            
-        # If any 2 AI models agree
-        if val_gemma_27b > 0 and (val_gemma_27b == val_gemma_12b):
-            return val_gemma_27b
-        if val_gemma_12b > 0 and (val_gemma_12b == val_qwen):
-            return val_gemma_12b
+        # Decode once and share the pixels with every reader that accepts them
+        try:
+            image = _load_image(image_path)
+        except Exception:
+            logger.exception("Error opening image %s", image_path)
+            return 0.0
 
-        # 1. If Gemma 27B agrees with a local OCR
-        if val_gemma_27b > 0 and (val_gemma_27b == val_easy or val_gemma_27b == val_tess):
-            return val_gemma_27b
+        easy_future = self._local_executor.submit(self.easyocr.read_meter_image, image, expected_value, custom_prompt)
+        tess_future = self._local_executor.submit(self.tesseract.read_meter_image, image, expected_value, custom_prompt)
+        return self._combine(image_path, easy_future.result(), tess_future.result(), expected_value, custom_prompt)
 
+    def read_meters(self, image_paths: List[str], expected_values: Optional[List[Optional[str]]] = None,
+                    custom_prompt: Optional[str] = None) -> List[float]:
+        """
+        Read a batch of meter images, running each local engine over all of them at once.
 
+        Args:
+            image_paths: Paths to the meter images
+            expected_values: Optional calibration value per image
+            custom_prompt: Optional prompt for the vision models
 
-        # 3. If local OCRs agree
-        if val_easy == val_tess and val_easy > 0:
+        Returns:
+            One consensus reading per image, in input order
+        """
+        expected_values = expected_values or [None] * len(image_paths)
+        easy_future = self._local_executor.submit(self.easyocr.read_meters_batch, image_paths, expected_values)
+        tess_future = self._local_executor.submit(self.tesseract.read_meters, image_paths, expected_values)
+
+        return [
+            self._combine(image_path, val_easy, val_tess, expected_value, custom_prompt)
+            for image_path, expected_value, val_easy, val_tess in zip(
+                image_paths, expected_values, easy_future.result(), tess_future.result()
+            )
+        ]
+
+    def _combine(self, image_path: str, val_easy: float, val_tess: float,
+                 expected_value: Optional[str], custom_prompt: Optional[str]) -> float:
+        """Consult the remote models where needed and vote on the final reading."""
+        # Calibration fast path: when a free local OCR already confirms the
+        # expected value, skip the remote model calls entirely
+        exp_float = _parse_expected(expected_value)
+        if exp_float and (_matches_expected(val_easy, exp_float) or _matches_expected(val_tess, exp_float)):
+            return exp_float
+
+        # Two independent local engines reading the same digits is already a
+        # winning vote, so the remote models could not change the outcome
+        if val_easy > 0 and val_easy == val_tess:
             return val_easy
+
+        # All remote readers work from the path so they share one cached,
+        # downscaled JPEG of the capture
+        gemma_27b_future = self._remote_executor.submit(
+            _call_remote, self.gemma_27b.read_meter, image_path, expected_value, custom_prompt
+        )
+        gemma_12b_future = self._remote_executor.submit(
+            _call_remote, self.gemma_12b.read_meter, image_path, expected_value, custom_prompt
+        )
+        qwen_future = self._remote_executor.submit(
+            _call_remote, self.qwen_vl.read_meter, image_path, expected_value, custom_prompt
+        )
+        val_gemma_27b = gemma_27b_future.result()
+        val_gemma_12b = gemma_12b_future.result()
+        val_qwen = qwen_future.result()
         
-        # 4. If no consensus, trust the "smartest" model that returned a value. 
-        # Prioritize Gemma 3 27B.
-        if val_gemma_27b > 0:
-            return val_gemma_27b
-        if val_gemma_12b > 0:
-            return val_gemma_12b
-        if val_qwen > 0:
-            return val_qwen
-
-
-        # 5. Fallback to local models
-        if val_easy > 0:
-            return val_easy
-        elif val_tess > 0:
-            return val_tess
-        else:
+        logger.debug(
+            "OCR Results - Tesseract: %s, EasyOCR: %s, Gemma 27B (Google): %s, Gemma 12B (OR): %s, Qwen2.5-VL: %s",
+            val_tess, val_easy, val_gemma_27b, val_gemma_12b, val_qwen
+        )
+        
+        values = {
+            "gemma_27b": val_gemma_27b,
+            "gemma_12b": val_gemma_12b,
+            "qwen": val_qwen,
+            "easy": val_easy,
+            "tess": val_tess,
+        }
+
+        # Voting / Consensus Logic: one pass summing the weights of the models
+        # behind each value, rounded so 1234.5 and 1234.50000001 agree
+        scores = Counter()
+        originals = {}
+        for name, weight in _VOTE_WEIGHTS.items():
+            val = values[name]
+            if val > 0:
+                key = round(val, 2)
+                scores[key] += weight
+                originals.setdefault(key, val)
+
+        if not scores:
             return 0.0
 
+        if exp_float:
+            for key in scores:
+                if _matches_expected(key, exp_float):
+                    scores[key] += _EXPECTED_BONUS
+
+        # most_common keeps insertion order on ties, i.e. the most trusted model wins
+        best, score = scores.most_common(1)[0]
+        if score < _VOTE_THRESHOLD:
+            # No real consensus: trust the most reliable model that answered
+            return next(val for val in values.values() if val > 0)
+        if exp_float and _matches_expected(best, exp_float):
+            return exp_float
+        return originals[best]
+
     def discover_meter(self, image_path: str) -> dict:
         """
         Analyze meter image to suggest type, serial number, and initial reading.
-        Returns: {meter_type: str, serial_number: str, reading: float}
+        Returns: {meter_type: str, serial_number: str, reading: float, confidence: float}
+
+        A confident reading is also stored as this image's read_meter result,
+        so reading the same capture right after enrolment skips the ensemble.
         """
         if not self.gemma_27b.model:
-            return {"meter_type": "Electricity", "serial_number": "UNKNOWN", "reading": 0.0}
+            return {"meter_type": "Electricity", "serial_number": "UNKNOWN", "reading": 0.0, "confidence": 0.0}
 
         try:
-            image = Image.open(image_path)
+            # Serial numbers are printed smaller than the display digits, keep more detail
+            image = _prep_for_ocr(_load_image(image_path), max_dim=2 * OCR_MAX_DIM, grayscale=False)
+            image_part = {"mime_type": "image/jpeg", "data": _to_jpeg_bytes(image)}
             prompt = """
             Analyze this meter image and return a JSON object with:
             1. 'meter_type': One of ['Electricity', 'Gas', 'Water', 'Heat']
             2. 'serial_number': The serial number or ID printed on the meter
             3. 'reading': The current numeric value shown on the display/dial (as a number)
+            4. 'confidence': How certain you are of the reading, from 0.0 to 1.0
             
-            Return ONLY the valid JSON object. Example: {"meter_type": "Gas", "serial_number": "123456", "reading": 102.5}
+            Return ONLY the valid JSON object. Example: {"meter_type": "Gas", "serial_number": "123456", "reading": 102.5, "confidence": 0.9}
             """
             
-            response = self.gemma_27b.model.generate_content([prompt, image])
+            response = self.gemma_27b.model.generate_content([prompt, image_part])
             text = response.text.strip()
+            # A truncated or filtered answer is not trustworthy, whatever it claims
+            finish_reason = response.candidates[0].finish_reason
+            finished = getattr(finish_reason, "name", finish_reason) in ("STOP", 1)
             
             # Clean possible markdown code blocks
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-            
-            import json
-            data = json.loads(text)
-            return {
-                "meter_type": data.get("meter_type", "Electricity"),
-                "serial_number": data.get("serial_number", "UNKNOWN"),
-                "reading": float(data.get("reading", 0.0))
-            }
-        except Exception as e:
-            print(f"Discovery error: {e}")
-            return {"meter_type": "Electricity", "serial_number": "UNKNOWN", "reading": 0.0}
+            match = _JSON_BLOCK.search(text)
+            if match:
+                text = match.group(1)
+
+            data = orjson.loads(text)
+            reading = float(data.get("reading", 0.0))
+            confidence = min(max(float(data.get("confidence", 0.0)), 0.0), 1.0) if finished else 0.0
+        except Exception:
+            logger.exception("Discovery error")
+            return {"meter_type": "Electricity", "serial_number": "UNKNOWN", "reading": 0.0, "confidence": 0.0}
+
+        if reading > 0 and confidence >= DISCOVERY_CONFIDENCE_THRESHOLD:
+            try:
+                key = _reading_cache_key(self, _file_digest(image_path), None, None)
+                with _READING_CACHE_LOCK:
+                    _READING_CACHE[key] = reading
+            except OSError:
+                pass
+
+        return {
+            "meter_type": data.get("meter_type", "Electricity"),
+            "serial_number": data.get("serial_number", "UNKNOWN"),
+            "reading": reading,
+            "confidence": confidence
+        }
+
+class RemoteMeterReader(MeterReader):
+    """Delegates OCR to the dedicated inference service (app/ocr_service.py)."""
+    def __init__(self, base_url: str, timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # Keep-alive session so every call reuses the connection to the service
+        self._session = requests.Session()
+
+    def _post_image(self, endpoint: str, image_path: str, data: Optional[dict] = None) -> dict:
+        with open(image_path, "rb") as image_file:
+            files = {"file": (os.path.basename(image_path), image_file, "image/jpeg")}
+            response = self._session.post(f"{self.base_url}{endpoint}", files=files, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
+        try:
+            result = self._post_image("/ocr", image_path, {"expected_value": expected_value, "custom_prompt": custom_prompt})
+            return float(result["value"])
+        except Exception:
+            logger.exception("Error reading meter via OCR service (%s)", self.base_url)
+            return 0.0
+
+    def discover_meter(self, image_path: str) -> dict:
+        try:
+            return self._post_image("/discover", image_path)
+        except Exception:
+            logger.exception("Discovery error via OCR service (%s)", self.base_url)
+            return {"meter_type": "Electricity", "serial_number": "UNKNOWN", "reading": 0.0, "confidence": 0.0}
+
+@lru_cache(maxsize=None)
+def get_smart_meter_reader() -> SmartMeterReader:
+    """
+    Return the process-wide SmartMeterReader.
+
+    Building a reader loads the EasyOCR model and sets up the API clients, so
+    one instance is shared across requests to keep models and connections warm.
+    """
+    return SmartMeterReader()
+
+@lru_cache(maxsize=None)
+def get_meter_reader() -> MeterReader:
+    """
+    Return the reader used by the API endpoints.
+
+    When OCR_REMOTE_URL is set, OCR runs in the dedicated inference service so
+    API workers are not tied up by it; otherwise the ensemble runs in-process.
+    """
+    remote_url = os.getenv("OCR_REMOTE_URL")
+    if remote_url:
+        return RemoteMeterReader(remote_url)
+    return get_smart_meter_reader()
 
 class BasicMeterReader(MeterReader):
-    def read_meter(self, image_path: str, expected_value: Optional[str] = None) -> float:
+    def read_meter(self, image_path: str, expected_value: Optional[str] = None, custom_prompt: Optional[str] = None) -> float:
         return 0.0
 
+# Camera JPEGs are several MB; the default 16 KiB buffer means hundreds of syscalls
+UPLOAD_COPY_CHUNK = 1024 * 1024
+
 def save_upload_file(upload_file, destination: str):
     try:
         with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+            src = upload_file.file
+            # Uploads large enough to have spilled to disk (Starlette spools
+            # anything over 1 MiB) can be copied kernel-side without passing
+            # through Python buffers. Smaller ones are left alone: asking an
+            # in-memory spool for fileno() would first write it out to disk.
+            start = src.tell()
+            size = src.seek(0, os.SEEK_END) - start
+            src.seek(start)
+            if size > UPLOAD_COPY_CHUNK and hasattr(os, "sendfile"):
+                try:
+                    in_fd = src.fileno()
+                except (io.UnsupportedOperation, AttributeError):
+                    in_fd = None
+                if in_fd is not None:
+                    src.flush()
+                    try:
+                        _sendfile_copy(in_fd, buffer.fileno(), start)
+                        return
+                    except OSError:
+                        src.seek(start)
+                        buffer.seek(0)
+                        buffer.truncate()
+            shutil.copyfileobj(src, buffer, length=UPLOAD_COPY_CHUNK)
     finally:
-        upload_file.file.close()
\ No newline at end of file
+        upload_file.file.close()
+
+def _sendfile_copy(in_fd: int, out_fd: int, offset: int) -> None:
+    """Copy in_fd from offset to its end into out_fd with os.sendfile."""
+    remaining = os.fstat(in_fd).st_size - offset
+    while remaining > 0:
+        sent = os.sendfile(out_fd, in_fd, offset, remaining)
+        if sent == 0:
+            break
+        offset += sent
+        remaining -= sent
\ No newline at end of file
@@ -1,5 +1,8 @@
 """Organization and RBAC service layer."""
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
+from cachetools import TTLCache
+from sqlalchemy import and_
 from sqlmodel import Session, select
 from fastapi import HTTPException, status
 
@@ -9,6 +12,14 @@ from ..models import (
 )
 
 
+# Cross-request cache of role lookups keyed by (user_id, organization_id).
+# Role writes through RBACService evict their entry; the TTL bounds how long
+# other workers or direct database edits can serve a stale role.
+_role_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_role_cache_lock = threading.Lock()
+_MISSING = object()
+
+
 class RBACService:
     """Service for managing roles and permissions."""
     
@@ -58,6 +69,7 @@ class RBACService:
             session.add(existing)
             session.commit()
             session.refresh(existing)
+            RBACService.invalidate_role_cache(user_id, organization_id)
             return existing
         
         # Create new assignment
@@ -70,6 +82,7 @@ class RBACService:
         session.add(user_org_role)
         session.commit()
         session.refresh(user_org_role)
+        RBACService.invalidate_role_cache(user_id, organization_id)
         return user_org_role
     
     @staticmethod
@@ -101,6 +114,7 @@ class RBACService:
         user_org_role.is_active = False
         session.add(user_org_role)
         session.commit()
+        RBACService.invalidate_role_cache(user_id, organization_id)
         return True
     
     @staticmethod
@@ -119,28 +133,27 @@ class RBACService:
         if user.platform_role == UserRoleEnum.SUPER_ADMIN.value:
             return list(session.exec(select(Organization).where(Organization.is_active == True)).all())
         
-        # Get orgs user is assigned to
-        user_org_roles = session.exec(
-            select(UserOrganizationRole)
-            .where(UserOrganizationRole.user_id == user.id)
-            .where(UserOrganizationRole.is_active == True)
-        ).all()
-        
-        org_ids = [uor.organization_id for uor in user_org_roles]
-        if not org_ids:
-            return []
-        
+        # Get orgs user is assigned to, in a single round-trip
         return list(session.exec(
             select(Organization)
-            .where(Organization.id.in_(org_ids))
+            .join(UserOrganizationRole, UserOrganizationRole.organization_id == Organization.id)
+            .where(UserOrganizationRole.user_id == user.id)
+            .where(UserOrganizationRole.is_active == True)
             .where(Organization.is_active == True)
         ).all())
     
+    @staticmethod
+    def invalidate_role_cache(user_id: int, organization_id: int) -> None:
+        """Drop the cached role of a user in an organization after it changed."""
+        with _role_cache_lock:
+            _role_cache.pop((user_id, organization_id), None)
+    
     @staticmethod
     def get_user_role_in_org(
         user_id: int,
         organization_id: int,
-        session: Session
+        session: Session,
+        cache: Optional[Dict[Tuple[int, int], Optional[str]]] = None
     ) -> Optional[str]:
         """
         Get a user's role in a specific organization.
@@ -149,26 +162,47 @@ class RBACService:
             user_id: The user ID
             organization_id: The organization ID
             session: Database session
+            cache: Optional per-request cache (see get_rbac_cache)
         
         Returns:
             The role string or None if not found
         """
-        user = session.get(User, user_id)
-        if not user:
+        key = (user_id, organization_id)
+        if cache is not None and key in cache:
+            return cache[key]
+        
+        with _role_cache_lock:
+            role = _role_cache.get(key, _MISSING)
+        if role is _MISSING:
+            role = RBACService._query_user_role_in_org(user_id, organization_id, session)
+            with _role_cache_lock:
+                _role_cache[key] = role
+        
+        if cache is not None:
+            cache[key] = role
+        return role
+    
+    @staticmethod
+    def _query_user_role_in_org(user_id: int, organization_id: int, session: Session) -> Optional[str]:
+        # Fetch the platform role and the org role together in one query
+        row = session.exec(
+            select(User.platform_role, UserOrganizationRole.role)
+            .outerjoin(UserOrganizationRole, and_(
+                UserOrganizationRole.user_id == User.id,
+                UserOrganizationRole.organization_id == organization_id,
+                UserOrganizationRole.is_active == True
+            ))
+            .where(User.id == user_id)
+        ).first()
+        if not row:
             return None
+        platform_role, org_role = row
         
         # Super admin is always super admin
-        if user.platform_role == UserRoleEnum.SUPER_ADMIN.value:
+        if platform_role == UserRoleEnum.SUPER_ADMIN.value:
             return UserRoleEnum.SUPER_ADMIN.value
         
-        user_org_role = session.exec(
-            select(UserOrganizationRole)
-            .where(UserOrganizationRole.user_id == user_id)
-            .where(UserOrganizationRole.organization_id == organization_id)
-            .where(UserOrganizationRole.is_active == True)
-        ).first()
-        
-        return user_org_role.role if user_org_role else None
+        return org_role
 
 
 class OrganizationService:
@@ -191,6 +225,35 @@ class OrganizationService:
         Returns:
             The created Organization
         
+        Raises:
+            HTTPException: If subdomain is already taken
+        """
+        org = OrganizationService.add_organization(name, subdomain, session)
+        session.commit()
+        session.refresh(org)
+        
+        return org
+    
+    @staticmethod
+    def add_organization(
+        name: str,
+        subdomain: Optional[str],
+        session: Session
+    ) -> Organization:
+        """
+        Add a new organization with default settings without committing.
+        
+        The session is flushed so the organization has its ID, letting callers
+        create dependent rows in the same transaction before committing.
+        
+        Args:
+            name: Organization name
+            subdomain: Optional subdomain
+            session: Database session
+        
+        Returns:
+            The added Organization
+        
         Raises:
             HTTPException: If subdomain is already taken
         """
@@ -212,8 +275,7 @@ class OrganizationService:
             billing_status="trial"
         )
         session.add(org)
-        session.commit()
-        session.refresh(org)
+        session.flush()
         
         # Create default settings
         settings = OrganizationSettings(
@@ -221,6 +283,6 @@ class OrganizationService:
             settings_json="{}"
         )
         session.add(settings)
-        session.commit()
+        session.flush()
         
         return org
@@ -8,7 +8,8 @@ This service provides:
 - Image quality assessment
 """
 
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional
 import os
 
 
@@ -34,7 +35,31 @@ class ImageValidationService:
     """Service for validating meter images during installation."""
     
     @staticmethod
-    def validate_fov(image_path: str) -> ValidationResult:
+    def image_loader(image_path: str) -> Callable[[], Any]:
+        """
+        Return a loader that decodes the image with OpenCV on first use.
+        
+        Pass the same loader to every check of one validation run so the
+        image is decoded at most once, and not at all while the checks
+        never look at the pixels.
+        
+        Args:
+            image_path: Path to the image file
+        
+        Returns:
+            Callable returning the decoded BGR image (None if unreadable)
+        """
+        @lru_cache(maxsize=1)
+        def load():
+            import cv2
+            return cv2.imread(image_path, cv2.IMREAD_COLOR)
+        return load
+    
+    @staticmethod
+    def validate_fov(
+        image_path: str,
+        load_image: Optional[Callable[[], Any]] = None
+    ) -> ValidationResult:
         """
         Validate Field of View - ensure meter is visible and properly framed.
         
@@ -47,6 +72,7 @@ class ImageValidationService:
         
         Args:
             image_path: Path to the image file
+            load_image: Optional shared loader for the decoded BGR image
         
         Returns:
             ValidationResult with pass/fail and confidence
@@ -75,7 +101,10 @@ class ImageValidationService:
         )
     
     @staticmethod
-    def detect_glare(image_path: str) -> ValidationResult:
+    def detect_glare(
+        image_path: str,
+        load_image: Optional[Callable[[], Any]] = None
+    ) -> ValidationResult:
         """
         Detect glare and assess lighting quality.
         
@@ -88,6 +117,7 @@ class ImageValidationService:
         
         Args:
             image_path: Path to the image file
+            load_image: Optional shared loader for the decoded BGR image
         
         Returns:
             ValidationResult with glare detection results
@@ -119,7 +149,8 @@ class ImageValidationService:
     @staticmethod
     def validate_initial_reading(
         image_path: str,
-        expected_range: Optional[tuple] = None
+        expected_range: Optional[tuple] = None,
+        load_image: Optional[Callable[[], Any]] = None
     ) -> ValidationResult:
         """
         Validate that an initial OCR reading can be obtained with good confidence.
@@ -133,6 +164,7 @@ class ImageValidationService:
         Args:
             image_path: Path to the image file
             expected_range: Optional (min, max) range for validation
+            load_image: Optional shared loader for the decoded BGR image
         
         Returns:
             ValidationResult with OCR results
@@ -191,8 +223,10 @@ class ImageValidationService:
         Returns:
             Dictionary of validation results by check type
         """
+        # One loader for all checks, so the image is decoded at most once
+        load_image = ImageValidationService.image_loader(image_path)
         return {
-            "fov": ImageValidationService.validate_fov(image_path),
-            "glare": ImageValidationService.detect_glare(image_path),
-            "ocr": ImageValidationService.validate_initial_reading(image_path)
+            "fov": ImageValidationService.validate_fov(image_path, load_image=load_image),
+            "glare": ImageValidationService.detect_glare(image_path, load_image=load_image),
+            "ocr": ImageValidationService.validate_initial_reading(image_path, load_image=load_image)
         }
@@ -1,210 +1,515 @@
-import json
-import base64
+import orjson
+try:
+    # Optional: SIMD (AVX2/NEON) base64 codec with the same API, several times faster
+    import pybase64 as base64
+except ImportError:
+    import base64
+import atexit
+import mmap
 import os
+import queue
+import re
 import sys
+import tempfile
+import threading
 import requests
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import time
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Load environment variables explicitly to ensure admin creds are available
-load_dotenv("/home/ogema/MeterReading/.env.local")
+@lru_cache(maxsize=None)
+def _load_env():
+    """Loads .env.local once, the first time admin creds are needed."""
+    from dotenv import load_dotenv
+    load_dotenv("/home/ogema/MeterReading/.env.local")
+
+# One keep-alive session for every call to the API, so a message reuses a
+# pooled connection instead of opening a new socket per request. Transient
+# failures are retried by the adapter with exponential backoff (urllib3 retries
+# at once, then waits 0.6s and 1.2s).
+# urllib3 only re-sends idempotent methods by default, which keeps a reading or
+# meter POST from being stored twice when the server answered after all.
+def _retrying_adapter(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS):
+    return HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=allowed_methods,
+            raise_on_status=False
+        )
+    )
+
+_SESSION = requests.Session()
+_SESSION.mount("http://", _retrying_adapter())
+# A duplicated log line is harmless, so log POSTs are retried too
+# (requests picks the longest matching prefix)
+_SESSION.mount("http://127.0.0.1:8000/api/logs/", _retrying_adapter(frozenset({"GET", "POST"})))
+
+# Bearer token shared across messages; refreshed shortly before the server expires it
+_token = None
+_token_expires_at = 0.0
+_token_lock = threading.Lock()
+TOKEN_REFRESH_MARGIN = 60
+
+DATA_URL_PREFIX = "data:image/jpeg;base64,"
+# Base64 characters decoded per step; a multiple of 4 so each chunk decodes on its own
+B64_CHUNK_CHARS = 64 * 1024
+# Write buffer for filesystems that cannot be memory-mapped (e.g. some NFS/SMB mounts)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Log events from concurrent messages are merged for up to this long / this many per request
+LOG_BATCH_WAIT = 0.05
+LOG_BATCH_SIZE = 100
+
+# Outbound bodies are serialized with orjson rather than requests' stdlib json encoder
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _auth_headers(token):
+    """Per-request Authorization header; the shared session's headers are never
+    touched because worker threads send through it concurrently."""
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+def _post_json(url, payload, timeout=5, token=None):
+    """POSTs payload as a JSON body through the shared session."""
+    headers = {**_JSON_HEADERS, **_auth_headers(token)} if token else _JSON_HEADERS
+    return _SESSION.post(url, data=orjson.dumps(payload), headers=headers, timeout=timeout)
+
+def _decode_chunks(base64_image, start):
+    """Yields the decoded bytes of base64_image[start:] one chunk at a time."""
+    for offset in range(start, len(base64_image), B64_CHUNK_CHARS):
+        # The camera firmware produces clean base64, so skip per-character validation
+        yield base64.b64decode(base64_image[offset:offset + B64_CHUNK_CHARS], validate=False)
+
+# Device directories already created by this process; a set add is atomic
+# under the GIL and a racing duplicate makedirs is harmless
+_known_dirs = set()
+
+def _ensure_dir(path):
+    """Creates path once per process instead of stat-ing every component per message."""
+    if path not in _known_dirs:
+        os.makedirs(path, exist_ok=True)
+        _known_dirs.add(path)
+
+# Line breaks inserted by MIME-style encoders (every 76 characters)
+_WHITESPACE = re.compile(r"\s")
+
+def _write_chunks(fd, size, base64_image, start):
+    """Decodes base64_image[start:] into the pre-sized file fd; returns the bytes written."""
+    try:
+        mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+    except OSError:
+        mm = None
+
+    position = 0
+    if mm is not None:
+        with mm:
+            for chunk in _decode_chunks(base64_image, start):
+                mm[position:position + len(chunk)] = chunk
+                position += len(chunk)
+    else:
+        with open(fd, "wb", buffering=WRITE_BUFFER_SIZE, closefd=False) as f:
+            for chunk in _decode_chunks(base64_image, start):
+                position += f.write(chunk)
+    if position != size:
+        raise ValueError(f"Decoded {position} bytes, expected {size}")
+    return position
+
+def write_base64_image(base64_image, start, filepath):
+    """Decode base64_image[start:] into filepath a chunk at a time.
+
+    The file is pre-sized to the exact decoded length and memory-mapped, so
+    each decoded chunk is copied straight into the page cache and never more
+    than one chunk of decoded bytes exists, instead of a second full copy of
+    the image next to the base64 string. Where the mount does not support
+    mmap the chunks go through a 1 MiB buffered writer instead, so typical
+    snapshots still reach the filesystem in a single write. Payloads the
+    chunked path cannot size correctly are decoded in one go instead.
+
+    The image is written to a hidden temporary file in the same directory and
+    renamed over filepath once complete, so readers never see a partial file.
+    """
+    # The size arithmetic and the 4-aligned chunks assume a contiguous alphabet
+    if _WHITESPACE.search(base64_image, start):
+        base64_image = "".join(base64_image[start:].split())
+        start = 0
+
+    padding = base64_image.endswith("=") + base64_image.endswith("==")
+    size = (len(base64_image) - start) * 3 // 4 - padding
+    if size <= 0:
+        raise ValueError("Empty image data")
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=os.path.dirname(filepath) or ".")
+    try:
+        try:
+            os.fchmod(fd, 0o644)
+            os.ftruncate(fd, size)
+            try:
+                _write_chunks(fd, size, base64_image, start)
+            except (ValueError, IndexError):
+                # Unexpected layout (e.g. padding in the middle of the data):
+                # fall back to a one-shot decode rather than drop the snapshot
+                data = base64.b64decode(base64_image[start:])
+                os.ftruncate(fd, 0)
+                os.lseek(fd, 0, os.SEEK_SET)
+                with open(fd, "wb", closefd=False) as f:
+                    f.write(data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        # Do not leave a truncated image behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 def log_message(level, message, details):
-    """Sends a log message to the logging API endpoint with a retry mechanism."""
+    """Sends a log message to the logging API endpoint (retried by the session adapter)."""
     log_data = {
         "level": level,
         "message": message,
         "details": details
     }
     
-    max_retries = 3
-    retry_delay = 2 # seconds
+    try:
+        # Use 127.0.0.1 to avoid ipv6/ipv4 resolution issues in some environments
+        response = _post_json("http://127.0.0.1:8000/api/logs/", log_data)
+        if response.status_code != 201:
+            print(f"Failed to log message (status {response.status_code}): {response.text}", file=sys.stderr)
+    except requests.exceptions.RequestException as e:
+        print(f"Error connecting to logging service: {e}", file=sys.stderr)
 
-    for attempt in range(max_retries):
-        try:
-            # Use 127.0.0.1 to avoid ipv6/ipv4 resolution issues in some environments
-            response = requests.post("http://127.0.0.1:8000/api/logs/", json=log_data, timeout=5)
-            if response.status_code == 201:
-                return # Success
-            else:
-                print(f"Failed to log message (status {response.status_code}): {response.text}", file=sys.stderr)
-        except requests.exceptions.RequestException as e:
-            print(f"Error connecting to logging service (attempt {attempt + 1}/{max_retries}): {e}", file=sys.stderr)
-        
-        if attempt < max_retries - 1:
-            time.sleep(retry_delay)
+def send_log_events(events):
+    """Sends a list of log events to the bulk logging endpoint in one request."""
+    try:
+        response = _post_json("http://127.0.0.1:8000/api/logs/bulk", {"events": events})
+        if response.status_code == 404:
+            # Older API without the bulk endpoint
+            for event in events:
+                log_message(event["level"], event["message"], event["details"])
+        elif response.status_code != 201:
+            print(f"Failed to log messages (status {response.status_code}): {response.text}", file=sys.stderr)
+    except requests.exceptions.RequestException as e:
+        print(f"Error connecting to logging service: {e}", file=sys.stderr)
+
+class LogBatcher:
+    """Merges the log events of concurrently processed messages into bulk requests.
+
+    A background thread waits for the first event, keeps collecting for up to
+    max_wait seconds or max_batch_size events, then sends the batch with
+    send_log_events. Under a burst of snapshots this turns one request per
+    message into one request per batch window.
+    """
+
+    def __init__(self, max_batch_size=LOG_BATCH_SIZE, max_wait=LOG_BATCH_WAIT):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, events):
+        """Queues events for the next batch."""
+        self._ensure_started()
+        for event in events:
+            self._queue.put(event)
+
+    def flush(self):
+        """Blocks until every queued event has been sent."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                send_log_events(batch)
+            except Exception as e:
+                print(f"Error sending log batch: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+_log_batcher = LogBatcher()
+# Send whatever is still queued before the process exits (CLI runs, listener shutdown)
+atexit.register(_log_batcher.flush)
+
+class LogBuffer:
+    """Collects the log events of one message and hands them to the shared batcher."""
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, level, message, details):
+        self.events.append({"level": level, "message": message, "details": details})
+
+    def flush(self):
+        if not self.events:
+            return
+        events, self.events = self.events, []
+        _log_batcher.submit(events)
+
+def save_snapshot(json_payload_str, logs):
+    """Decodes one MQTT snapshot payload and writes the image under uploads/.
+
+    json_payload_str may be str or the raw MQTT bytes. Returns the snapshot
+    details that upload_reading needs; events are added to logs.
+    """
+    # The payload is dominated by the base64 image string, which orjson scans in C
+    payload = orjson.loads(json_payload_str)
     
-    print("Giving up on logging message after multiple retries.", file=sys.stderr)
+    dev_mac_raw = payload['values']['devMac']
+    dev_mac_sanitized = dev_mac_raw.replace(':', '-')
+    timestamp = payload['ts']
+    snap_type = payload['values']['snapType']
+    # Take the image out of the payload so only one reference to it remains
+    base64_image = payload['values'].pop('image')
+    del payload
+    
+    # Readable local capture time for the filename, formatted without strftime
+    tm = time.localtime(timestamp // 1000)
+    time_str = f"{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}_{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}"
+    # One ISO string shared by the log details and the reading payload
+    capture_iso = datetime.fromtimestamp(timestamp / 1000).isoformat()
 
-def decode_and_save_image(json_payload_str):
-    try:
-        payload = json.loads(json_payload_str)
-        
-        dev_mac_raw = payload['values']['devMac']
-        dev_mac_sanitized = dev_mac_raw.replace(':', '-')
-        timestamp = payload['ts']
-        snap_type = payload['values']['snapType']
-        base64_image = payload['values']['image']
-        
-        # Convert timestamp to a readable datetime string for the filename
-        capture_time = datetime.fromtimestamp(timestamp / 1000)
-        time_str = capture_time.strftime('%Y%m%d_%H%M%S')
+    # Skip the data URL prefix by offset rather than copying the string
+    start = len(DATA_URL_PREFIX) if base64_image.startswith(DATA_URL_PREFIX) else 0
 
-        # Remove the data URL prefix
-        if base64_image.startswith("data:image/jpeg;base64,"):
-            base64_image = base64_image.split("data:image/jpeg;base64,")[1]
-        
-        # Decode the base64 string
-        image_data = base64.b64decode(base64_image)
+    # Create device-specific directory
+    device_dir = os.path.join("uploads", dev_mac_sanitized)
+    _ensure_dir(device_dir)
 
-        # Create device-specific directory
-        device_dir = os.path.join("uploads", dev_mac_sanitized)
-        os.makedirs(device_dir, exist_ok=True)
+    # Create filename
+    filename = f"{time_str}_{snap_type}.jpeg"
+    filepath = os.path.join(device_dir, filename)
 
-        # Create filename
-        filename = f"{time_str}_{snap_type}.jpeg"
-        filepath = os.path.join(device_dir, filename)
+    # Save the image
+    write_base64_image(base64_image, start, filepath)
+    del base64_image
 
-        # Save the image
-        with open(filepath, 'wb') as f:
-            f.write(image_data)
-        
-        print(f"Image saved to {filepath}")
-        
-        # Log success
-        log_details = {
-            "device_mac": dev_mac_raw,
-            "filepath": filepath,
-            "capture_time": capture_time.isoformat(),
-            "snap_type": snap_type
+    print(f"Image saved to {filepath}")
+    
+    # Log success
+    log_details = {
+        "device_mac": dev_mac_raw,
+        "filepath": filepath,
+        "capture_time": capture_iso,
+        "snap_type": snap_type
+    }
+    logs.add("INFO", "Successfully converted MQTT message to photo.", log_details)
+
+    return {
+        "device_mac": dev_mac_raw,
+        "device_dir_name": dev_mac_sanitized,
+        "filename": filename,
+        "filepath": filepath,
+        "capture_iso": capture_iso,
+        "log_details": log_details,
+    }
+
+def upload_reading(snapshot, logs):
+    """Posts the reading for a saved snapshot, auto-provisioning the meter if needed."""
+    dev_mac_raw = snapshot["device_mac"]
+    dev_mac_sanitized = snapshot["device_dir_name"]
+    filename = snapshot["filename"]
+    capture_iso = snapshot["capture_iso"]
+    log_details = snapshot["log_details"]
+
+    # Simulate meter reading for logging purposes
+    # In a real scenario, this would call the OCR service
+    # For this prototype, we simulate a reading value incrementing based on time or random
+    import random
+    mock_value = 12345.0 + random.uniform(0, 100)
+    reading_data = {"value": round(mock_value, 2), "confidence": 0.95, "error": None}
+    
+    # ACTUALLY SAVE THE READING VIA API
+    # We assume the dev_mac_raw acts as the serial number for now, or mapped to one.
+    # Ensure the meter exists first (optional, or relying on API to handle/error)
+    try:
+        # Post reading to API
+        # Endpoint: /meters/{serial_number}/reading
+        # We need to construct the reading payload
+        api_reading_payload = {
+            "value": reading_data["value"],
+            "timestamp": capture_iso,
+            "image_path": f"/uploads/{dev_mac_sanitized}/{filename}"
         }
-        log_message("INFO", "Successfully converted MQTT message to photo.", log_details)
-
-        # Simulate meter reading for logging purposes
-        # In a real scenario, this would call the OCR service
-        # For this prototype, we simulate a reading value incrementing based on time or random
-        import random
-        mock_value = 12345.0 + random.uniform(0, 100)
-        reading_data = {"value": round(mock_value, 2), "confidence": 0.95, "error": None}
         
-        # ACTUALLY SAVE THE READING VIA API
-        # We assume the dev_mac_raw acts as the serial number for now, or mapped to one.
-        # Ensure the meter exists first (optional, or relying on API to handle/error)
-        try:
-            # Post reading to API
-            # Endpoint: /meters/{serial_number}/reading
-            # We need to construct the reading payload
-            api_reading_payload = {
-                "value": reading_data["value"],
-                "timestamp": capture_time.isoformat(),
-                "image_path": f"/uploads/{dev_mac_sanitized}/{filename}"
-            }
-            
-            # Authenticate
+        # Authenticate (token is sent per request)
+        token = get_auth_token()
+        
+        # Using 127.0.0.1 for reliability
+        read_res = _post_json(
+            f"http://127.0.0.1:8000/meters/{dev_mac_raw}/reading_data", 
+            api_reading_payload,
+            token=token
+        )
+        if read_res.status_code == 401 and token:
+            # Cached token rejected (e.g. the API restarted with a new secret); log in again once
+            invalidate_auth_token(token)
             token = get_auth_token()
-            headers = {}
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-            
-            # Using 127.0.0.1 for reliability
-            read_res = requests.post(
+            read_res = _post_json(
                 f"http://127.0.0.1:8000/meters/{dev_mac_raw}/reading_data", 
-                json=api_reading_payload,
-                headers=headers,
-                timeout=5
+                api_reading_payload,
+                token=token
             )
-            if read_res.status_code == 200: # success for explicit data creation
-                log_message("INFO", f"Reading saved for {dev_mac_raw}: {reading_data['value']}", {"api_response": read_res.json()})
-            else:
-                log_message("WARNING", f"Failed to save reading for {dev_mac_raw}", {"status": read_res.status_code, "text": read_res.text})
+        if read_res.status_code == 200: # success for explicit data creation
+            logs.add("INFO", f"Reading saved for {dev_mac_raw}: {reading_data['value']}", {"api_response": read_res.json()})
+        else:
+            logs.add("WARNING", f"Failed to save reading for {dev_mac_raw}", {"status": read_res.status_code, "text": read_res.text})
+            
+            # Auto-create meter if not exists (simple auto-provisioning logic)
+            if read_res.status_code == 404 and token:
+                logs.add("INFO", f"Meter {dev_mac_raw} not found. Attempting auto-provisioning.", {})
+                
+                # Get default organization ID
+                org_res = _SESSION.get(
+                    "http://127.0.0.1:8000/api/organizations/", headers=_auth_headers(token), timeout=5
+                )
+                default_org_id = 1  # Fallback
+                if org_res.status_code == 200:
+                    orgs = orjson.loads(org_res.content)
+                    # Find "undefined" organization
+                    for org in orgs:
+                        if org.get("subdomain") == "undefined":
+                            default_org_id = org["id"]
+                            break
+                
+                create_meter_payload = {
+                    "serial_number": dev_mac_raw,
+                    "meter_type": "Electricity", # Default
+                    "unit": "kWh",
+                    "organization_id": default_org_id
+                }
+                create_res = _post_json(
+                    "http://127.0.0.1:8000/meters/", 
+                    create_meter_payload,
+                    token=token
+                )
                 
-                # Auto-create meter if not exists (simple auto-provisioning logic)
-                if read_res.status_code == 404 and token:
-                    log_message("INFO", f"Meter {dev_mac_raw} not found. Attempting auto-provisioning.", {})
-                    
-                    # Get default organization ID
-                    org_res = requests.get("http://127.0.0.1:8000/api/organizations/", headers=headers, timeout=5)
-                    default_org_id = 1  # Fallback
-                    if org_res.status_code == 200:
-                        orgs = org_res.json()
-                        # Find "undefined" organization
-                        for org in orgs:
-                            if org.get("subdomain") == "undefined":
-                                default_org_id = org["id"]
-                                break
-                    
-                    create_meter_payload = {
-                        "serial_number": dev_mac_raw,
-                        "meter_type": "Electricity", # Default
-                        "unit": "kWh",
-                        "organization_id": default_org_id
-                    }
-                    create_res = requests.post(
-                        "http://127.0.0.1:8000/meters/", 
-                        json=create_meter_payload, 
-                        headers=headers,
-                        timeout=5
+                logs.add("INFO", f"Auto-provisioning status for {dev_mac_raw}: {create_res.status_code}", {"response": create_res.text})
+
+                if create_res.status_code in [200, 201]:
+                     # Retry reading post
+                     retry_res = _post_json(
+                        f"http://127.0.0.1:8000/meters/{dev_mac_raw}/reading_data", 
+                        api_reading_payload,
+                        token=token
                     )
-                    
-                    log_message("INFO", f"Auto-provisioning status for {dev_mac_raw}: {create_res.status_code}", {"response": create_res.text})
-
-                    if create_res.status_code in [200, 201]:
-                         # Retry reading post
-                         retry_res = requests.post(
-                            f"http://127.0.0.1:8000/meters/{dev_mac_raw}/reading_data", 
-                            json=api_reading_payload,
-                            headers=headers,
-                            timeout=5
-                        )
-                         if retry_res.status_code == 200:
-                             log_message("INFO", f"Retry reading saved for {dev_mac_raw}: {reading_data['value']}", {"api_response": retry_res.json()})
-                         else:
-                             log_message("WARNING", f"Retry reading failed for {dev_mac_raw}", {"status": retry_res.status_code, "text": retry_res.text})
-        except Exception as api_err:
-             log_message("ERROR", f"API Error saving reading: {api_err}", {})
-
-        log_details["meter_reading"] = reading_data
-        log_message("INFO", f"Meter reading processed for {dev_mac_raw}.", log_details)
-
-        return filepath
+                     if retry_res.status_code == 200:
+                         logs.add("INFO", f"Retry reading saved for {dev_mac_raw}: {reading_data['value']}", {"api_response": retry_res.json()})
+                     else:
+                         logs.add("WARNING", f"Retry reading failed for {dev_mac_raw}", {"status": retry_res.status_code, "text": retry_res.text})
+    except Exception as api_err:
+         logs.add("ERROR", f"API Error saving reading: {api_err}", {})
+
+    log_details["meter_reading"] = reading_data
+    logs.add("INFO", f"Meter reading processed for {dev_mac_raw}.", log_details)
+
+def log_processing_error(logs, error, json_payload_str):
+    """Reports a snapshot that could not be processed."""
+    error_message = f"Error processing image: {error}"
+    print(error_message, file=sys.stderr)
+    if isinstance(json_payload_str, (bytes, bytearray)):
+        json_payload_str = json_payload_str.decode("utf-8", errors="replace")
+    logs.add("ERROR", error_message, {"payload": json_payload_str})
 
+def decode_and_save_image(json_payload_str):
+    logs = LogBuffer()
+    try:
+        snapshot = save_snapshot(json_payload_str, logs)
+        upload_reading(snapshot, logs)
+        return snapshot["filepath"]
     except Exception as e:
-        error_message = f"Error processing image: {e}"
-        print(error_message, file=sys.stderr)
-        log_message("ERROR", error_message, {"payload": json_payload_str})
-        sys.exit(1)
+        log_processing_error(logs, e, json_payload_str)
+        # Raise rather than exit so in-process callers survive
+        raise
+    finally:
+        # Queue this message's events for the next bulk request
+        logs.flush()
 
 def get_auth_token():
-    """Authenticates as admin and returns the access token."""
-    username = os.getenv("ADMIN_USERNAME", "admin")
-    password = os.getenv("ADMIN_PASSWORD", "securepassword123")
-    
-    try:
-        response = requests.post(
-            "http://127.0.0.1:8000/token",
-            data={"username": username, "password": password},
-            timeout=5
-        )
-        if response.status_code == 200:
-            return response.json().get("access_token")
-        else:
-            print(f"Auth failed: {response.text}", file=sys.stderr)
+    """Returns the admin access token, logging in only when the cached one is about to expire."""
+    global _token, _token_expires_at
+    with _token_lock:
+        if _token and time.monotonic() < _token_expires_at:
+            return _token
+        
+        _load_env()
+        username = os.getenv("ADMIN_USERNAME", "admin")
+        password = os.getenv("ADMIN_PASSWORD", "securepassword123")
+        
+        try:
+            response = _SESSION.post(
+                "http://127.0.0.1:8000/token",
+                data={"username": username, "password": password},
+                timeout=5
+            )
+            if response.status_code == 200:
+                _token = response.json().get("access_token")
+                # Trust the token's own exp claim; fall back to the configured lifetime
+                seconds_left = _jwt_seconds_left(_token)
+                if seconds_left is None:
+                    seconds_left = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)) * 60
+                _token_expires_at = time.monotonic() + seconds_left - TOKEN_REFRESH_MARGIN
+                return _token
+            else:
+                print(f"Auth failed: {response.text}", file=sys.stderr)
+                return None
+        except Exception as e:
+            print(f"Auth error: {e}", file=sys.stderr)
             return None
-    except Exception as e:
-        print(f"Auth error: {e}", file=sys.stderr)
+
+def invalidate_auth_token(token):
+    """Drops the cached token after the API rejected it, unless another thread already replaced it."""
+    global _token, _token_expires_at
+    with _token_lock:
+        if _token == token:
+            _token = None
+            _token_expires_at = 0.0
+
+def _jwt_seconds_left(token):
+    """Returns the seconds until the JWT's exp claim, or None if it cannot be read."""
+    try:
+        claims = token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))
+        return claims["exp"] - time.time()
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
         return None
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] != "-":
         json_str = sys.argv[1]
-        
-        # Decode and save image (this part was already working)
-        filepath = decode_and_save_image(json_str)
-        # Note: decode_and_save_image calls the API inside it now.
-        # But we need to pass the token TO decode_and_save_image or have it call get_auth_token()
-        
+    elif not sys.stdin.isatty():
+        # Preferred: pipe the payload in, which avoids the argv size limit
+        # (~128 KB per argument on Linux) and is parsed from bytes as-is
+        json_str = sys.stdin.buffer.read()
     else:
-        print("Usage: python script.py <json_payload_string>", file=sys.stderr)
+        print("Usage: python decode_image.py <json_payload_string>", file=sys.stderr)
+        print("       python decode_image.py [-] < payload.json", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        filepath = decode_and_save_image(json_str)
+    except Exception:
         sys.exit(1)
@@ -1,9 +1,11 @@
 import paho.mqtt.client as mqtt
-import json
 import os
-import subprocess
+import queue
+import threading
 from dotenv import load_dotenv
 
+from decode_image import LogBuffer, log_processing_error, save_snapshot, upload_reading
+
 # Load configuration
 load_dotenv(".env.local")
 
@@ -13,6 +15,20 @@ MQTT_USER = os.getenv("MQTT_USERNAME")
 MQTT_PASS = os.getenv("MQTT_PASSWORD")
 MQTT_TOPIC = "v1/devices/me/telemetry" # Standard topic for these types of sensing cameras
 
+# Messages go through a two-stage pipeline on worker threads: decode workers
+# write the image to disk, upload workers post the reading to the API. The
+# network loop keeps receiving while both stages run, and the next image is
+# decoded while the previous reading is still being uploaded.
+DECODE_WORKERS = int(os.getenv("MQTT_DECODE_WORKERS", 2))
+UPLOAD_WORKERS = int(os.getenv("MQTT_UPLOAD_WORKERS", 6))
+
+# Each raw payload holds a full base64 image, so the decode queue is bounded:
+# under a burst the network loop waits in on_message instead of buffering
+# without limit.
+MAX_IN_FLIGHT = int(os.getenv("MQTT_MAX_IN_FLIGHT", 16))
+decode_queue = queue.Queue(maxsize=MAX_IN_FLIGHT)
+upload_queue = queue.Queue(maxsize=MAX_IN_FLIGHT)
+
 def on_connect(client, userdata, flags, rc, properties=None):
     if rc == 0:
         print(f"✅ Connected to MQTT Broker at {MQTT_BROKER}", flush=True)
@@ -25,26 +41,48 @@ def on_connect(client, userdata, flags, rc, properties=None):
 
 def on_message(client, userdata, msg):
     try:
-        payload_str = msg.payload.decode()
+        # orjson parses the raw bytes directly, so skip decoding them to str here
         print(f"📩 Received message on {msg.topic}", flush=True)
         
-        # Call the existing decoding script
-        result = subprocess.run(
-            ["/home/ogema/MeterReading/venv/bin/python3", "decode_image.py", payload_str],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode == 0:
-            print(f"✅ Successfully processed message: {result.stdout.strip()}", flush=True)
-            if result.stderr:
-                print(f"⚠️ Warnings: {result.stderr.strip()}", flush=True)
-        else:
-            print(f"❌ Error processing message: {result.stderr.strip()}", flush=True)
-            
+        decode_queue.put(msg.payload)
     except Exception as e:
         print(f"⚠️ Unexpected error: {e}", flush=True)
 
+def decode_worker():
+    """Stage one: decode and store snapshots, then hand them to the upload stage."""
+    while True:
+        payload = decode_queue.get()
+        logs = LogBuffer()
+        try:
+            snapshot = save_snapshot(payload, logs)
+        except Exception as e:
+            log_processing_error(logs, e, payload)
+            logs.flush()
+            print(f"❌ Error processing message: {e}", flush=True)
+        else:
+            upload_queue.put((snapshot, logs))
+        finally:
+            decode_queue.task_done()
+
+def upload_worker():
+    """Stage two: post the reading of each stored snapshot; failures stay isolated to it."""
+    while True:
+        snapshot, logs = upload_queue.get()
+        try:
+            upload_reading(snapshot, logs)
+            print(f"✅ Successfully processed message: {snapshot['filepath']}", flush=True)
+        except Exception as e:
+            print(f"❌ Error processing message: {e}", flush=True)
+        finally:
+            logs.flush()
+            upload_queue.task_done()
+
+def start_workers():
+    for i in range(DECODE_WORKERS):
+        threading.Thread(target=decode_worker, name=f"decode-{i}", daemon=True).start()
+    for i in range(UPLOAD_WORKERS):
+        threading.Thread(target=upload_worker, name=f"upload-{i}", daemon=True).start()
+
 def run_listener():
     client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
     
@@ -55,6 +93,7 @@ def run_listener():
     client.on_message = on_message
 
     print(f"🚀 Starting MQTT Listener (Broker: {MQTT_BROKER}:{MQTT_PORT})...")
+    start_workers()
     client.connect(MQTT_BROKER, MQTT_PORT, 60)
     client.loop_forever()
 
@@ -10,12 +10,24 @@ This script:
 """
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:8000"
 
+# requests.Session is not guaranteed to be thread-safe, so each thread
+# (main and workers) keeps its own keep-alive session
+_local = threading.local()
+
+def get_session():
+    """Return this thread's requests session, creating it on first use."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
 def login(username, password):
     """Login and get access token."""
-    response = requests.post(
+    response = get_session().post(
         f"{BASE_URL}/token",
         data={"username": username, "password": password}
     )
@@ -25,6 +37,20 @@ def login(username, password):
         print(f"Login failed for {username}: {response.text}")
         return None
 
+def create_organization(org_data, headers):
+    """Create an organization.
+
+    Returns (organization or None, error text or None).
+    """
+    response = get_session().post(f"{BASE_URL}/api/organizations/", json=org_data, headers=headers)
+    if response.status_code == 200:
+        return response.json(), None
+    return None, response.text
+
+def create_project(project_data, headers):
+    """Create a project and return the raw response."""
+    return get_session().post(f"{BASE_URL}/projects/", json=project_data, headers=headers)
+
 def test_multi_tenant_api():
     """Run comprehensive multi-tenant API tests."""
     
@@ -56,24 +82,6 @@ def test_multi_tenant_api():
         "billing_status": "active"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/api/organizations/",
-        json=org1_data,
-        headers=headers_admin
-    )
-    
-    if response.status_code == 200:
-        org1 = response.json()
-        print(f"✅ Created Organization 1: {org1['name']} (ID: {org1['id']})")
-    else:
-        print(f"⚠️  Organization 1 may already exist: {response.text}")
-        # Try to get existing org
-        response = requests.get(f"{BASE_URL}/api/organizations/", headers=headers_admin)
-        orgs = response.json()
-        org1 = next((o for o in orgs if o["subdomain"] == "acme"), None)
-        if org1:
-            print(f"   Using existing: {org1['name']} (ID: {org1['id']})")
-    
     org2_data = {
         "name": "Beta Industries",
         "subdomain": "beta",
@@ -81,26 +89,34 @@ def test_multi_tenant_api():
         "billing_status": "trial"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/api/organizations/",
-        json=org2_data,
-        headers=headers_admin
-    )
+    # The two organizations are independent, so create them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        org_futures = [
+            executor.submit(create_organization, data, headers_admin)
+            for data in (org1_data, org2_data)
+        ]
+        (org1, org1_error), (org2, org2_error) = [f.result() for f in org_futures]
     
-    if response.status_code == 200:
-        org2 = response.json()
-        print(f"✅ Created Organization 2: {org2['name']} (ID: {org2['id']})")
-    else:
-        print(f"⚠️  Organization 2 may already exist: {response.text}")
-        response = requests.get(f"{BASE_URL}/api/organizations/", headers=headers_admin)
-        orgs = response.json()
-        org2 = next((o for o in orgs if o["subdomain"] == "beta"), None)
-        if org2:
-            print(f"   Using existing: {org2['name']} (ID: {org2['id']})")
+    # Any org that could not be created probably exists already; one list call covers both
+    if org1_error is not None or org2_error is not None:
+        response = get_session().get(f"{BASE_URL}/api/organizations/", headers=headers_admin)
+        orgs_by_subdomain = {o["subdomain"]: o for o in response.json()}
+        if org1_error is not None:
+            org1 = orgs_by_subdomain.get(org1_data["subdomain"])
+        if org2_error is not None:
+            org2 = orgs_by_subdomain.get(org2_data["subdomain"])
+    
+    for number, org, error in ((1, org1, org1_error), (2, org2, org2_error)):
+        if error is None:
+            print(f"✅ Created Organization {number}: {org['name']} (ID: {org['id']})")
+        else:
+            print(f"⚠️  Organization {number} may already exist: {error}")
+            if org:
+                print(f"   Using existing: {org['name']} (ID: {org['id']})")
     
     # Step 3: List all organizations (Super Admin should see all)
     print("\n[3] Verifying Super Admin can see all organizations...")
-    response = requests.get(f"{BASE_URL}/api/organizations/", headers=headers_admin)
+    response = get_session().get(f"{BASE_URL}/api/organizations/", headers=headers_admin)
     if response.status_code == 200:
         orgs = response.json()
         print(f"✅ Super Admin sees {len(orgs)} organizations")
@@ -109,7 +125,7 @@ def test_multi_tenant_api():
     
     # Step 4: Get user's organizations (should be empty for new users)
     print("\n[4] Testing 'my-organizations' endpoint...")
-    response = requests.get(f"{BASE_URL}/api/organizations/my-organizations", headers=headers_admin)
+    response = get_session().get(f"{BASE_URL}/api/organizations/my-organizations", headers=headers_admin)
     if response.status_code == 200:
         my_orgs = response.json()
         print(f"✅ Super Admin has access to {len(my_orgs)} organizations (should see all)")
@@ -124,38 +140,27 @@ def test_multi_tenant_api():
             "organization_id": org1["id"]
         }
         
-        response = requests.post(
-            f"{BASE_URL}/projects/",
-            json=project1_data,
-            headers=headers_admin
-        )
-        
-        if response.status_code == 200:
-            project1 = response.json()
-            print(f"✅ Created project in Org 1: {project1['name']}")
-        else:
-            print(f"❌ Failed to create project in Org 1: {response.text}")
-        
         project2_data = {
             "name": "Beta Factory Project",
             "description": "Manufacturing facility",
             "organization_id": org2["id"]
         }
         
-        response = requests.post(
-            f"{BASE_URL}/projects/",
-            json=project2_data,
-            headers=headers_admin
-        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = list(executor.map(
+                lambda data: create_project(data, headers_admin),
+                (project1_data, project2_data)
+            ))
         
-        if response.status_code == 200:
-            project2 = response.json()
-            print(f"✅ Created project in Org 2: {project2['name']}")
-        else:
-            print(f"❌ Failed to create project in Org 2: {response.text}")
+        for number, response in enumerate(responses, start=1):
+            if response.status_code == 200:
+                project = response.json()
+                print(f"✅ Created project in Org {number}: {project['name']}")
+            else:
+                print(f"❌ Failed to create project in Org {number}: {response.text}")
         
         # List all projects (Super Admin should see both)
-        response = requests.get(f"{BASE_URL}/projects/", headers=headers_admin)
+        response = get_session().get(f"{BASE_URL}/projects/", headers=headers_admin)
         if response.status_code == 200:
             projects = response.json()
             print(f"✅ Super Admin sees {len(projects)} total projects")
@@ -0,0 +1,120 @@
+"""Tests for SmartMeterReader's weighted vote and the expected-value matching."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.ocr import (
+    EasyOCRMeterReader,
+    SmartMeterReader,
+    TesseractMeterReader,
+    _contains_expected,
+)
+
+
+class FixedReader:
+    """Stands in for a remote model: always reads the same value and counts calls."""
+
+    def __init__(self, value: float):
+        self.value = value
+        self.calls = 0
+
+    def read_meter(self, image_path, expected_value=None, custom_prompt=None):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def make_reader():
+    """Build a SmartMeterReader whose remote models return fixed values."""
+    executors = []
+
+    def build(gemma_27b=0.0, gemma_12b=0.0, qwen=0.0):
+        # Skip __init__ so no OCR engine or API client is set up
+        reader = SmartMeterReader.__new__(SmartMeterReader)
+        reader.gemma_27b = FixedReader(gemma_27b)
+        reader.gemma_12b = FixedReader(gemma_12b)
+        reader.qwen_vl = FixedReader(qwen)
+        reader._remote_executor = ThreadPoolExecutor(max_workers=3)
+        executors.append(reader._remote_executor)
+        return reader
+
+    yield build
+    for executor in executors:
+        executor.shutdown()
+
+
+def combine(reader, val_easy=0.0, val_tess=0.0, expected_value=None):
+    return reader._combine("meter.jpg", val_easy, val_tess, expected_value, None)
+
+
+# --- Voting ---
+
+def test_agreeing_remote_models_outvote_gemma_27b(make_reader):
+    # Gemma 12B + Qwen (2 + 2) beat Gemma 27B alone (3)
+    reader = make_reader(gemma_27b=100.0, gemma_12b=200.0, qwen=200.0)
+    assert combine(reader) == 200.0
+
+
+def test_tie_goes_to_the_most_trusted_model(make_reader):
+    # 100.0 has Gemma 27B (3), 200.0 has Gemma 12B + EasyOCR (2 + 1)
+    reader = make_reader(gemma_27b=100.0, gemma_12b=200.0)
+    assert combine(reader, val_easy=200.0) == 100.0
+
+
+def test_tie_below_threshold_falls_back_by_model_priority(make_reader):
+    # Gemma 12B and Qwen (2 each) disagree and Gemma 27B failed
+    reader = make_reader(gemma_12b=100.0, qwen=200.0)
+    assert combine(reader) == 100.0
+
+
+def test_expected_bonus_breaks_a_tie(make_reader):
+    # Same 2-2 split as above, but Qwen's value matches the calibration reading
+    reader = make_reader(gemma_12b=100.0, qwen=200.0)
+    assert combine(reader, expected_value="200") == 200.0
+
+
+def test_no_readings_returns_zero(make_reader):
+    reader = make_reader()
+    assert combine(reader) == 0.0
+
+
+def test_expected_bonus_lets_a_single_model_win(make_reader):
+    # Qwen alone (2) matches the calibration value and beats Gemma 27B (3)
+    reader = make_reader(gemma_27b=100.0, qwen=12345.6)
+    assert combine(reader, expected_value="12345,6") == 12345.6
+
+
+# --- Short-circuits ---
+
+def test_local_match_with_expected_skips_remote_models(make_reader):
+    reader = make_reader(gemma_27b=100.0, gemma_12b=100.0, qwen=100.0)
+    assert combine(reader, val_easy=12345.6, val_tess=7.0, expected_value="12345.6") == 12345.6
+    assert reader.gemma_27b.calls == reader.gemma_12b.calls == reader.qwen_vl.calls == 0
+
+
+def test_agreeing_local_engines_skip_remote_models(make_reader):
+    reader = make_reader(gemma_27b=100.0)
+    assert combine(reader, val_easy=42.5, val_tess=42.5) == 42.5
+    assert reader.gemma_27b.calls == 0
+
+
+# --- Expected value matching ---
+
+@pytest.mark.parametrize("text", ["3", "45", "5.6", "2345.6", "1234.6"])
+def test_short_fragment_does_not_match_expected(text):
+    # Includes readings missing one significant digit, which are off by orders of magnitude
+    assert not _contains_expected(text, "12345.6")
+
+
+@pytest.mark.parametrize("text", ["12345.6", "l2345,6", "Reading: 12345.6 kWh", "S/N 77 12345.6"])
+def test_full_reading_matches_expected(text):
+    assert _contains_expected(text, "12345.6")
+
+
+def test_substring_is_not_reported_as_expected_value():
+    assert EasyOCRMeterReader._best_candidate(["3"], "12345.6") == 3.0
+    assert TesseractMeterReader._parse_text("45", "12345.6") == 45.0
+
+
+def test_misread_expected_value_is_recognised():
+    assert EasyOCRMeterReader._best_candidate(["l2345,6"], "12345.6") == 12345.6
@@ -0,0 +1,52 @@
+"""Tests that Tesseract's batch mode reads the same input as single reads."""
+import shutil
+import subprocess
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.ocr import TesseractMeterReader, _prep_for_ocr
+
+
+@pytest.fixture
+def meter_images(tmp_path):
+    """A couple of large colour captures with a number drawn on them."""
+    paths = []
+    for i, text in enumerate(["12345", "678.9"]):
+        image = Image.new("RGB", (2400, 600), "white")
+        ImageDraw.Draw(image).text((200, 200), text, fill="black", font_size=200)
+        path = tmp_path / f"meter_{i}.jpg"
+        image.save(path, quality=95)
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_list_points_at_prepared_images(meter_images, monkeypatch):
+    reader = TesseractMeterReader.__new__(TesseractMeterReader)
+    seen = []
+
+    def fake_run(cmd, **kwargs):
+        # Read the images Tesseract would have been given before they are cleaned up
+        with open(cmd[1]) as list_file:
+            for listed in list_file.read().split():
+                with Image.open(listed) as image:
+                    seen.append(image.copy())
+        return subprocess.CompletedProcess(cmd, 0, stdout="1\f2\f", stderr="")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    assert reader.read_meters(meter_images) == [1.0, 2.0]
+
+    assert len(seen) == len(meter_images)
+    for path, listed in zip(meter_images, seen):
+        with Image.open(path) as original:
+            expected = _prep_for_ocr(original)
+        assert listed.mode == expected.mode
+        assert listed.size == expected.size
+        assert listed.tobytes() == expected.tobytes()
+
+
+@pytest.mark.skipif(shutil.which("tesseract") is None, reason="tesseract binary not installed")
+def test_batch_and_single_reads_agree(meter_images):
+    reader = TesseractMeterReader()
+    single = [reader.read_meter_image(Image.open(path)) for path in meter_images]
+    assert reader.read_meters(meter_images) == single
@@ -11,7 +11,9 @@ This script simulates the end-to-end flow of an installer:
 import asyncio
 import json
 import os
+import shutil
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 # Configuration
@@ -102,6 +104,14 @@ def create_org_and_installer(admin_token: str) -> Dict[str, Any]:
         "token": admin_token # Admin can act as installer
     }
 
+def place_test_capture(src: str, dst: str):
+    """Put the test image at dst, as a hard link when possible so no data is copied."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Different filesystem, or links not supported
+        shutil.copyfile(src, dst)
+
 def run_installation_workflow(setup_data: Dict[str, Any]):
     print_step("Running Installation Workflow")
     
@@ -138,15 +148,21 @@ def run_installation_workflow(setup_data: Dict[str, Any]):
         "ip_address": "192.168.1.100",
         "status_data": {"rssi": -60}
     }
-    requests.post(f"{BASE_URL}/api/installations/cameras/heartbeat", json=heartbeat_payload)
-    print(f"✅ Simulated Camera Heartbeat for {cam_serial}")
     
     # 3. Create a dummy test image for FOV/Glare/OCR simulation
     # The simulated services check for file existence
     image_path = f"uploads/test_capture_{cam_serial}.jpg"
-    with open("test_image.jpg", "rb") as src, open(image_path, "wb") as dst:
-        dst.write(src.read())
-    print(f"✅ Created dummy test image at {image_path}")
+    
+    # Both only need to be done before validation, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        heartbeat = executor.submit(
+            requests.post, f"{BASE_URL}/api/installations/cameras/heartbeat", json=heartbeat_payload
+        )
+        capture = executor.submit(place_test_capture, "test_image.jpg", image_path)
+        heartbeat.result()
+        print(f"✅ Simulated Camera Heartbeat for {cam_serial}")
+        capture.result()
+        print(f"✅ Created dummy test image at {image_path}")
     
     # 4. Run Validation
     print("\nRequesting Validation...")
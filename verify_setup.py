@@ -1,131 +1,267 @@
+import argparse
+import base64
+import json
+import orjson
+import pathlib
 import requests
 import os
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv(".env.local")
 
 BASE_URL = "http://127.0.0.1:8000"
 
-def test_everything():
-    # 0. Login
-    print("Logging in...")
+# Upload the real test_image.jpg if there is one, else dummy bytes; read once and
+# shared by every seeded chain instead of touching the disk per upload
+TEST_IMAGE_NAME = "test_image.jpg"
+TEST_IMAGE_BYTES = (
+    pathlib.Path(TEST_IMAGE_NAME).read_bytes()
+    if os.path.exists(TEST_IMAGE_NAME)
+    else b"fake image content"
+)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Upper bound on fixtures seeded at the same time with --count
+MAX_SEED_WORKERS = 8
+
+# Token from the last run; reused while it has more than TOKEN_MIN_VALIDITY seconds left
+TOKEN_CACHE_FILE = pathlib.Path(".verify_setup_token.json")
+TOKEN_MIN_VALIDITY = 30
+_login_lock = threading.Lock()
+
+def _jwt_exp(token):
+    """Returns the exp claim of a JWT (unverified), or 0 if it cannot be read."""
+    try:
+        claims = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))["exp"]
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return 0
+
+def load_cached_token(username):
+    """Returns the cached token for this server and user if it is still valid."""
+    try:
+        cached = json.loads(TOKEN_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+    if cached.get("base_url") != BASE_URL or cached.get("username") != username:
+        return None
+    if cached.get("exp", 0) <= time.time() + TOKEN_MIN_VALIDITY:
+        return None
+    return cached.get("token")
+
+def save_cached_token(username, token):
+    try:
+        TOKEN_CACHE_FILE.write_text(json.dumps({
+            "base_url": BASE_URL,
+            "username": username,
+            "token": token,
+            "exp": _jwt_exp(token)
+        }))
+    except OSError as e:
+        print(f"Could not cache token: {e}")
+
+def login(session, use_cache=True):
+    """Sets the session's bearer token, reusing the cached one when possible."""
     username = os.getenv("ADMIN_USERNAME", "admin")
     password = os.getenv("ADMIN_PASSWORD", "securepassword123")
-    
-    resp = requests.post(f"{BASE_URL}/token", data={"username": username, "password": password})
-    if resp.status_code != 200:
-        print(f"Login failed: {resp.text}")
-        return
-    
-    token = resp.json()["access_token"]
-    headers = {"Authorization": f"Bearer {token}"}
-    print(f"Logged in successfully.")
-
-    # 1. Create Organization
-    print("Creating Organization...")
-    unique_suffix = str(uuid.uuid4())[:8]
-    org_name = f"Test Org {unique_suffix}"
-    org_subdomain = f"test-{unique_suffix}"
-    
-    resp = requests.post(f"{BASE_URL}/api/organizations/", json={
-        "name": org_name,
-        "subdomain": org_subdomain
-    }, headers=headers)
-    
-    if resp.status_code != 200:
-        print(f"Create Organization Failed: {resp.status_code} - {resp.text}")
-        return
-        
-    org = resp.json()
-    org_id = org["id"]
-    print(f"Organization created with ID: {org_id}")
-
-    # 2. Create Project
-    print("Creating Project...")
-    resp = requests.post(f"{BASE_URL}/projects/", json={
-        "name": f"Test Project {unique_suffix}", 
-        "description": "Demo",
-        "organization_id": org_id
-    }, headers=headers)
-    
-    if resp.status_code != 200:
-        print(f"Create Project Failed: {resp.status_code} - {resp.text}")
+
+    token = load_cached_token(username) if use_cache else None
+    if token:
+        print("Using cached token.")
+    else:
+        resp = session.post(f"{BASE_URL}/token", data={"username": username, "password": password})
+        if resp.status_code != 200:
+            print(f"Login failed: {resp.text}")
+            return False
+        token = resp.json()["access_token"]
+        save_cached_token(username, token)
+        print(f"Logged in successfully.")
+
+    session.headers["Authorization"] = f"Bearer {token}"
+    return True
+
+def relogin_on_401(session):
+    """Response hook: if the (cached) token is rejected, log in again once and resend."""
+    def hook(resp, *args, **kwargs):
+        if resp.status_code != 401 or resp.request.url.endswith("/token"):
+            return resp
+        with _login_lock:
+            # Another thread may already have refreshed the token
+            if resp.request.headers.get("Authorization") == session.headers.get("Authorization"):
+                print("Token rejected, logging in again...")
+                if not login(session, use_cache=False):
+                    return resp
+        retry = resp.request.copy()
+        retry.deregister_hook("response", hook)
+        retry.headers["Authorization"] = session.headers["Authorization"]
+        return session.send(retry, **kwargs)
+    return hook
+
+def make_session(pool_maxsize=4):
+    """One keep-alive session so every step reuses the same connection(s)."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize))
+    return session
+
+def test_everything(count=1):
+    """Logs in, then seeds `count` independent fixture chains concurrently."""
+    workers = min(count, MAX_SEED_WORKERS)
+    session = make_session(pool_maxsize=max(4, workers))
+
+    # 0. Login
+    print("Logging in...")
+    if not login(session):
         return
-    project_id = resp.json()["id"]
-    print(f"Project created with ID: {project_id}")
-
-    # 3. Create Customer
-    print("Creating Customer...")
-    resp = requests.post(f"{BASE_URL}/customers/", json={
-        "name": "Test Customer", 
-        "project_id": project_id,
-        "organization_id": org_id
-    }, headers=headers)
-    assert resp.status_code == 200
-    customer_id = resp.json()["id"]
-    print(f"Customer created with ID: {customer_id}")
-
-    # 4. Create Building
-    print("Creating Building...")
-    resp = requests.post(f"{BASE_URL}/buildings/", json={
-        "name": "HQ", 
-        "address": "123 Main St", 
-        "customer_id": customer_id,
-        "organization_id": org_id
-    }, headers=headers)
-    assert resp.status_code == 200
-    building_id = resp.json()["id"]
-    print(f"Building created with ID: {building_id}")
-
-    # 5. Create Place
-    print("Creating Place...")
-    resp = requests.post(f"{BASE_URL}/places/", json={
-        "name": "Basement", 
-        "building_id": building_id,
-        "organization_id": org_id
-    }, headers=headers)
-    assert resp.status_code == 200
-    place_id = resp.json()["id"]
-    print(f"Place created with ID: {place_id}")
-
-    # 6. Create Meter
-    print("Creating Meter...")
+    session.hooks["response"].append(relogin_on_401(session))
+
+    if count == 1:
+        passed = seed_one(session, str(uuid.uuid4())[:8])
+    else:
+        # Each chain only depends on its own IDs, so chains run side by side
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda suffix: seed_one(session, suffix),
+                [str(uuid.uuid4())[:8] for _ in range(count)]
+            ))
+        passed = all(results)
+        print(f"Seeded {sum(results)}/{count} fixture chains")
+
+    if passed:
+        print("ALL TESTS PASSED")
+
+def post_json(session, path, payload=None, **kwargs):
+    """POSTs to the API and returns the decoded JSON body.
+
+    JSON bodies are encoded and decoded with orjson. Raises requests.HTTPError
+    (with the status and response text) on any non-2xx status.
+    """
+    if payload is not None:
+        kwargs["data"] = orjson.dumps(payload)
+        kwargs["headers"] = JSON_HEADERS
+    resp = session.post(f"{BASE_URL}{path}", **kwargs)
+    if not resp.ok:
+        raise requests.HTTPError(f"{resp.status_code} - {resp.text}", response=resp)
+    return orjson.loads(resp.content)
+
+def create_chain_stepwise(session, unique_suffix, serial):
+    """Creates org → project → customer → building → place → meter one request at a time."""
+    try:
+        # 1. Create Organization
+        print("Creating Organization...")
+        org_id = post_json(session, "/api/organizations/", {
+            "name": f"Test Org {unique_suffix}",
+            "subdomain": f"test-{unique_suffix}"
+        })["id"]
+        print(f"Organization created with ID: {org_id}")
+
+        # 2. Create Project
+        print("Creating Project...")
+        project_id = post_json(session, "/projects/", {
+            "name": f"Test Project {unique_suffix}", 
+            "description": "Demo",
+            "organization_id": org_id
+        })["id"]
+        print(f"Project created with ID: {project_id}")
+
+        # 3. Create Customer
+        print("Creating Customer...")
+        customer_id = post_json(session, "/customers/", {
+            "name": "Test Customer", 
+            "project_id": project_id,
+            "organization_id": org_id
+        })["id"]
+        print(f"Customer created with ID: {customer_id}")
+
+        # 4. Create Building
+        print("Creating Building...")
+        building_id = post_json(session, "/buildings/", {
+            "name": "HQ", 
+            "address": "123 Main St", 
+            "customer_id": customer_id,
+            "organization_id": org_id
+        })["id"]
+        print(f"Building created with ID: {building_id}")
+
+        # 5. Create Place
+        print("Creating Place...")
+        place_id = post_json(session, "/places/", {
+            "name": "Basement", 
+            "building_id": building_id,
+            "organization_id": org_id
+        })["id"]
+        print(f"Place created with ID: {place_id}")
+
+        # 6. Create Meter
+        print("Creating Meter...")
+        meter_id = post_json(session, "/meters/", {
+            "serial_number": serial, 
+            "meter_type": "Gas", 
+            "unit": "m3", 
+            "place_id": place_id,
+            "organization_id": org_id
+        })["id"]
+        print(f"Meter created with ID: {meter_id}")
+    except requests.HTTPError as e:
+        print(f"Create Failed: {e}")
+        return False
+    return True
+
+def seed_one(session, unique_suffix):
+    """Creates org → project → customer → building → place → meter → reading.
+
+    Returns True if every step succeeded.
+    """
     serial = f"TEST-{unique_suffix}"
-    resp = requests.post(f"{BASE_URL}/meters/", json={
-        "serial_number": serial, 
-        "meter_type": "Gas", 
-        "unit": "m3", 
-        "place_id": place_id,
-        "organization_id": org_id
-    }, headers=headers)
-    if resp.status_code != 200:
-        print(f"Create Meter Failed: {resp.text}")
-    assert resp.status_code == 200
-    meter_id = resp.json()["id"]
-    print(f"Meter created with ID: {meter_id}")
+
+    # 1-6. Create the whole chain in one request and one transaction
+    print("Creating Organization → Meter chain...")
+    try:
+        ids = post_json(session, "/api/test-fixtures/bulk", {
+            "organization": {"name": f"Test Org {unique_suffix}", "subdomain": f"test-{unique_suffix}"},
+            "project": {"name": f"Test Project {unique_suffix}", "description": "Demo"},
+            "customer": {"name": "Test Customer"},
+            "building": {"name": "HQ", "address": "123 Main St"},
+            "place": {"name": "Basement"},
+            "meter": {"serial_number": serial, "meter_type": "Gas", "unit": "m3"}
+        })
+        print(f"Organization {ids['organization']['id']}, project {ids['project']['id']}, "
+              f"customer {ids['customer']['id']}, building {ids['building']['id']}, "
+              f"place {ids['place']['id']}, meter {ids['meter']['id']} created.")
+    except requests.HTTPError as e:
+        if e.response.status_code != 404:
+            print(f"Create Fixtures Failed: {e}")
+            return False
+        # Fixtures endpoint not mounted (ENABLE_TEST_FIXTURES unset or older API):
+        # create the chain step by step
+        if not create_chain_stepwise(session, unique_suffix, serial):
+            return False
 
     # 7. Upload Reading
     print("Uploading Reading...")
-    # Use existing test_image.jpg if it exists, else dummy
-    dummy_file = "test_image.jpg"
-    if not os.path.exists(dummy_file):
-        with open(dummy_file, "wb") as f:
-            f.write(b"fake image content")
-    
-    with open(dummy_file, "rb") as f:
-        files = {"file": (dummy_file, f, "image/jpeg")}
-        resp = requests.post(f"{BASE_URL}/meters/{serial}/reading", files=files, headers=headers)
-    
-    if resp.status_code != 200:
-        print(f"Upload Reading Failed: {resp.text}")
-        return
+    files = {"file": (TEST_IMAGE_NAME, TEST_IMAGE_BYTES, "image/jpeg")}
+    try:
+        reading_data = post_json(session, f"/meters/{serial}/reading", files=files)
+    except requests.HTTPError as e:
+        print(f"Upload Reading Failed: {e}")
+        return False
     
-    reading_data = resp.json()
     print(f"Reading created: {reading_data}")
     # Note: Value might be different if OCR isn't running or mocked differently
     # But in current implementation it returns 12345.67 if mocked
-    print("ALL TESTS PASSED")
+    return True
 
 if __name__ == "__main__":
-    test_everything()
+    parser = argparse.ArgumentParser(description="End-to-end smoke test that seeds test fixtures")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"API to test (default: {BASE_URL})")
+    parser.add_argument("--count", type=int, default=1, help="number of fixture chains to seed concurrently")
+    args = parser.parse_args()
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    BASE_URL = args.base_url.rstrip("/")
+    test_everything(args.count)